@@ -1,24 +1,31 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
+from pymongo import AsyncMongoClient, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from contextlib import asynccontextmanager
 import os
 import logging
 import asyncio
 import httpx
 import time
-from collections import defaultdict
+import hashlib
+import gzip
+import re
+from collections import defaultdict, deque
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, BeforeValidator
+from typing import Annotated, List, Literal, Optional
 import uuid
-from datetime import datetime, timedelta
-import random
-import json
-import io
-from passlib.context import CryptContext
+from datetime import datetime, timedelta, timezone
+import orjson
+import bcrypt
 from jose import JWTError, jwt
 import secrets
 from emergentintegrations.llm.chat import LlmChat, UserMessage
@@ -30,18 +37,33 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Each Uvicorn worker holds its own pool, so split the connection budget across workers
+WEB_CONCURRENCY = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+MONGO_POOL_SIZE = max(1, int(os.environ.get("MONGO_MAX_CONNECTIONS", "50")) // WEB_CONCURRENCY)
+client = AsyncMongoClient(
+    mongo_url,
+    maxPoolSize=MONGO_POOL_SIZE,
+    minPoolSize=min(10, MONGO_POOL_SIZE),
+    serverSelectionTimeoutMS=2000,
+    connectTimeoutMS=2000,
+    waitQueueTimeoutMS=2000,  # Fail fast when the pool is exhausted instead of queueing indefinitely
+    socketTimeoutMS=20000,  # Must outlast the notepad stream's 15 s change-stream await
+    retryWrites=True,
+    compressors="zlib",
+)
 db = client[os.environ['DB_NAME']]
 
-# Create the main app without a prefix
-app = FastAPI()
+# Outbound HTTP (push, webhooks, Google session checks) shares one pool so connections and TLS sessions are reused
+http_client = httpx.AsyncClient(
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=200)
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer(auto_error=False)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT Settings
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", secrets.token_hex(32))
@@ -53,30 +75,203 @@ GUEST_EXPIRATION_DAYS = 90
 USER_EXPIRATION_DAYS = 365  # 1 year for registered users
 PREMIUM_EXPIRATION_DAYS = None  # Never expires
 EXPIRATION_WARNING_DAYS = 7
+RECENT_ENTRIES_LIMIT = 100  # Notepad reads return only the most recent entries
+MAX_NOTEPAD_ENTRIES = int(os.environ.get("MAX_NOTEPAD_ENTRIES", "500"))  # Appends keep only the newest entries, bounding document size
+CODE_CANDIDATE_BATCH = 8  # Codes probed per round trip after a collision in create_notepad
+
+# Fields needed to build a NotepadResponse; entries are capped and the full count is computed server-side
+NOTEPAD_PROJECTION = {
+    "_id": 0, "id": 1, "code": 1, "created_at": 1, "updated_at": 1,
+    "account_type": 1, "expires_at": 1, "user_id": 1,
+    "entries": {"$slice": -RECENT_ENTRIES_LIMIT},
+    "entry_count": {"$size": {"$ifNull": ["$entries", []]}},
+}
+
+
+class UTCJSONResponse(ORJSONResponse):
+    """orjson response that marks the naive datetimes we store as UTC, so browsers don't read them as local time"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
 
 
 # ==================== Rate Limiting ====================
 
 class RateLimiter:
-    """Simple in-memory rate limiter"""
-    def __init__(self):
-        self.requests = defaultdict(list)
-
-    def is_rate_limited(self, key: str, max_requests: int, window_seconds: int) -> bool:
-        now = time.time()
-        self.requests[key] = [t for t in self.requests[key] if now - t < window_seconds]
-        if len(self.requests[key]) >= max_requests:
+    """Rolling-window rate limiter, shared across workers through Redis when REDIS_URL is set"""
+    # Trim, count and record in one atomic round trip: KEYS[1] is the window's sorted set,
+    # ARGV is now (ms), window (ms), limit and a unique member for this hit
+    WINDOW_SCRIPT = """
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+        if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then return 1 end
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+        redis.call('PEXPIRE', KEYS[1], ARGV[2])
+        return 0
+    """
+
+    # Longest window any caller uses; in-process keys idle for longer hold nothing and are swept
+    MAX_WINDOW_SECONDS = 600
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.requests = defaultdict(deque)  # In-process fallback: key -> hit times, oldest first
+        self.last_sweep = time.monotonic()
+        # Short timeouts so an unreachable Redis falls back to memory instead of stalling requests
+        self.redis = aioredis.from_url(
+            redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+        ) if redis_url else None
+        # register_script sends EVALSHA and reloads the script if the server lost it
+        self.window_script = self.redis.register_script(self.WINDOW_SCRIPT) if self.redis else None
+
+    async def is_rate_limited(self, key: str, max_requests: int, window_seconds: int) -> bool:
+        if self.window_script:
+            now_ms = int(time.time() * 1000)
+            try:
+                return bool(await self.window_script(
+                    keys=[f"ratelimit:{key}"],
+                    args=[now_ms, window_seconds * 1000, max_requests, f"{now_ms}:{secrets.token_hex(4)}"]
+                ))
+            except RedisError as e:
+                logging.getLogger(__name__).warning(f"Rate limiter falling back to memory: {e}")
+        now = time.monotonic()
+        if now - self.last_sweep > self.MAX_WINDOW_SECONDS:
+            # One-shot IPs would otherwise keep their keys forever
+            self.requests = defaultdict(deque, {
+                k: v for k, v in self.requests.items() if v and now - v[-1] < self.MAX_WINDOW_SECONDS
+            })
+            self.last_sweep = now
+        hits = self.requests[key]
+        while hits and now - hits[0] >= window_seconds:
+            hits.popleft()
+        if len(hits) >= max_requests:
             return True
-        self.requests[key].append(now)
+        hits.append(now)
         return False
 
-rate_limiter = RateLimiter()
+    async def close(self):
+        if self.redis:
+            await self.redis.aclose()
+
+rate_limiter = RateLimiter(os.environ.get("REDIS_URL"))
+
+class NotepadCache:
+    """Short-lived per-process cache of notepad reads; concurrent misses for a code share one query.
+
+    Writes invalidate only the worker that handled them, so with several workers a read may
+    lag a write by up to ttl seconds; keep ttl small enough for that to be acceptable.
+    """
+    def __init__(self, ttl: float = 2.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = {}  # code -> (fetched_at, document or None)
+        self.pending = {}  # code -> in-flight fetch task
+
+    async def get(self, code: str, fetch) -> Optional[dict]:
+        hit = self.entries.get(code)
+        if hit and time.monotonic() - hit[0] < self.ttl:
+            return hit[1]
+        task = self.pending.get(code)
+        if task is None:
+            task = self.pending[code] = asyncio.ensure_future(fetch(code))
+            task.add_done_callback(lambda t: self._store(code, t))
+        # Shielded so one disconnecting poller doesn't cancel the fetch the others are awaiting
+        return await asyncio.shield(task)
+
+    def _store(self, code: str, task: asyncio.Future):
+        if self.pending.get(code) is not task:
+            return  # Invalidated while in flight; the result may predate the write
+        del self.pending[code]
+        if task.cancelled() or task.exception():
+            return
+        self.entries.pop(code, None)
+        if len(self.entries) >= self.maxsize:
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[code] = (time.monotonic(), task.result())
+
+    def invalidate(self, code: str):
+        self.entries.pop(code, None)
+        self.pending.pop(code, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.pending.clear()
+
+class ExpiringCache:
+    """Bounded per-process dict whose entries each carry their own expiry"""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = {}  # key -> (expires at, monotonic seconds; value)
+
+    def get(self, key):
+        hit = self.entries.get(key)
+        if hit is None:
+            return None
+        if hit[0] <= time.monotonic():
+            del self.entries[key]
+            return None
+        return hit[1]
+
+    def set(self, key, value, ttl: float):
+        self.entries.pop(key, None)
+        if len(self.entries) >= self.maxsize:
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (time.monotonic() + ttl, value)
+
+    def pop(self, key):
+        self.entries.pop(key, None)
+
+notepad_cache = NotepadCache(ttl=float(os.environ.get("NOTEPAD_CACHE_TTL", "1.0")), maxsize=10_000)
 
 def get_client_ip(request: Request) -> str:
     forwarded = request.headers.get("x-forwarded-for")
     return forwarded.split(",")[0].strip() if forwarded else request.client.host
 
 
+# ==================== Static Pages ====================
+
+class StaticPage:
+    """HTML page (or asset) encoded and gzipped once at import time and served with a strong ETag"""
+    def __init__(self, content: str, max_age: int = 3600, media_type: str = "text/html; charset=utf-8", immutable: bool = False):
+        self.body = content.encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, 9)
+        self.media_type = media_type
+        digest = hashlib.md5(self.body).hexdigest()
+        self.version = digest[:12]
+        self.etag = f'"{digest}"'
+        cache_control = f"public, max-age={max_age}" + (", immutable" if immutable else "")
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    def response(self, request: Request) -> Response:
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=self.headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                content=self.gzip_body,
+                media_type=self.media_type,
+                headers={**self.headers, "Content-Encoding": "gzip"}
+            )
+        return Response(content=self.body, media_type=self.media_type, headers=self.headers)
+
+
+class PageTemplate:
+    """HTML template pre-split at import time into encoded chunks around its {{ slot }} markers"""
+    SLOT_RE = re.compile(r"\{\{ (\w+) \}\}")
+
+    def __init__(self, html: str):
+        parts = self.SLOT_RE.split(html)
+        self.chunks = [p.encode("utf-8") for p in parts[0::2]]
+        self.slots = parts[1::2]
+        # Folded into ETags of rendered pages so a changed template invalidates them
+        self.version = hashlib.md5(html.encode("utf-8")).hexdigest()[:8]
+
+    def render(self, **values) -> bytes:
+        """Fill each slot with a str (encoded here) or already-encoded bytes"""
+        out = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = values[slot]
+            out.append(value if isinstance(value, bytes) else value.encode("utf-8"))
+            out.append(chunk)
+        return b"".join(out)
+
+
 class PasswordResetRequest(BaseModel):
     email: EmailStr
 
@@ -108,40 +303,71 @@ ADJECTIVES = [
     'red', 'blue', 'green', 'gold', 'silver', 'bright', 'dark', 'swift',
     'calm', 'wild', 'cool', 'warm', 'soft', 'bold', 'quick', 'slow',
     'big', 'tiny', 'happy', 'lucky', 'sunny', 'rainy', 'snowy', 'windy',
-    'fresh', 'crisp', 'smooth', 'sharp', 'sweet', 'spicy', 'salty', 'tangy'
+    'fresh', 'crisp', 'smooth', 'sharp', 'sweet', 'spicy', 'salty', 'tangy',
+    'amber', 'azure', 'brave', 'brisk', 'busy', 'clear', 'clever', 'cosmic',
+    'cozy', 'curly', 'dusty', 'eager', 'early', 'easy', 'epic', 'fancy',
+    'fast', 'fine', 'fluffy', 'frosty', 'funny', 'fuzzy', 'gentle', 'giant',
+    'glad', 'grand', 'great', 'hazy', 'humble', 'icy', 'jolly', 'keen',
+    'kind', 'lazy', 'light', 'little', 'lively', 'loud', 'lunar', 'magic',
+    'merry', 'mighty', 'misty', 'modern', 'neat', 'nice', 'noble', 'odd',
+    'pale', 'pink', 'plain', 'polar', 'proud', 'pure', 'purple', 'quiet',
+    'rapid', 'rare', 'ready', 'royal', 'rusty', 'sandy', 'shiny', 'shy',
+    'silky', 'silly', 'simple', 'sleek', 'sleepy', 'solar', 'solid', 'stormy',
+    'sturdy', 'super', 'tall', 'tidy', 'tough', 'urban', 'vast', 'vivid',
+    'witty', 'young', 'zesty', 'jade', 'teal', 'navy', 'coral', 'ruby',
+    'mellow', 'nimble', 'cheery', 'breezy', 'dreamy', 'golden', 'rosy', 'velvet'
 ]
 
 NOUNS = [
     'tiger', 'eagle', 'wolf', 'bear', 'hawk', 'lion', 'fox', 'deer',
     'moon', 'star', 'sun', 'cloud', 'rain', 'snow', 'wind', 'storm',
     'tree', 'leaf', 'rose', 'lily', 'oak', 'pine', 'palm', 'fern',
-    'rock', 'wave', 'fire', 'ice', 'sand', 'lake', 'river', 'peak'
+    'rock', 'wave', 'fire', 'ice', 'sand', 'lake', 'river', 'peak',
+    'apple', 'acorn', 'anchor', 'arrow', 'badger', 'beach', 'berry', 'birch',
+    'bison', 'bloom', 'brook', 'cactus', 'canyon', 'cedar', 'comet', 'coral',
+    'crane', 'creek', 'crow', 'daisy', 'delta', 'dove', 'dune', 'elk',
+    'falcon', 'feather', 'finch', 'fjord', 'flame', 'forest', 'frog', 'gecko',
+    'glacier', 'grove', 'gull', 'harbor', 'hare', 'heron', 'hill', 'horse',
+    'island', 'ivy', 'jaguar', 'koala', 'lark', 'lemon', 'lotus', 'lynx',
+    'maple', 'marsh', 'meadow', 'mango', 'mesa', 'mint', 'moose', 'moth',
+    'nova', 'ocean', 'olive', 'orca', 'otter', 'owl', 'panda', 'parrot',
+    'pearl', 'pebble', 'penguin', 'plum', 'pond', 'poppy', 'puma', 'quail',
+    'raven', 'reef', 'robin', 'sage', 'seal', 'shark', 'shore', 'sky',
+    'sparrow', 'spruce', 'stone', 'swan', 'thistle', 'thunder', 'tide', 'trail',
+    'tulip', 'valley', 'willow', 'wren', 'yak', 'zebra', 'bay', 'cliff'
 ]
 
 
+# Both word lists hold exactly 128 entries, so a 7-bit mask picks a word without bias
+_ADJ = tuple(ADJECTIVES)
+_NOUN = tuple(NOUNS)
+assert len(_ADJ) == len(_NOUN) == 128
+
+
 def generate_memorable_code():
-    """Generate a short, memorable code like 'redtiger42'"""
-    adj = random.choice(ADJECTIVES)
-    noun = random.choice(NOUNS)
-    num = random.randint(10, 99)
-    return f"{adj}{noun}{num}"
+    """Generate a short, memorable code like 'redtiger427'"""
+    # One CSPRNG draw: 7 bits adjective, 7 bits noun, 18 bits for the 100-999 suffix
+    # (128 x 128 x 900, about 14.7M codes; the modulo bias on 18 bits is negligible)
+    r = secrets.randbits(32)
+    return f"{_ADJ[r & 127]}{_NOUN[(r >> 7) & 127]}{100 + (r >> 14) % 900}"
 
 
-def get_expiration_date(account_type: str = "guest"):
+def get_expiration_date(account_type: str = "guest", now: Optional[datetime] = None):
     """Get expiration date based on account type"""
     if account_type == "premium":
         return None  # Never expires
-    elif account_type == "user":
-        return datetime.utcnow() + timedelta(days=USER_EXPIRATION_DAYS)
+    now = now or datetime.utcnow()
+    if account_type == "user":
+        return now + timedelta(days=USER_EXPIRATION_DAYS)
     else:  # guest
-        return datetime.utcnow() + timedelta(days=GUEST_EXPIRATION_DAYS)
+        return now + timedelta(days=GUEST_EXPIRATION_DAYS)
 
 
-def calculate_days_remaining(expires_at: datetime) -> int:
+def calculate_days_remaining(expires_at: datetime, now: Optional[datetime] = None) -> int:
     """Calculate days remaining until expiration"""
     if not expires_at:
         return None  # Premium - never expires
-    delta = expires_at - datetime.utcnow()
+    delta = expires_at - (now or datetime.utcnow())
     return max(0, delta.days)
 
 
@@ -153,12 +379,16 @@ def is_expired(expires_at: datetime) -> bool:
 
 
 # Password helpers
+# bcrypt is deliberately slow; callers run these through run_in_threadpool to keep the event loop free
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        return False  # Empty or malformed hash, e.g. Google-only accounts
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
 # JWT helpers
@@ -170,12 +400,58 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 
+TOKEN_CACHE_SECONDS = 30
+token_cache = ExpiringCache(maxsize=10_000)
+
+
 def decode_token(token: str) -> dict:
+    # Verified payloads are reused briefly, keyed by a digest so raw tokens aren't retained
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    # Never cache past the token's own expiry
+    ttl = min(TOKEN_CACHE_SECONDS, payload.get("exp", float("inf")) - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl)
+    return payload
+
+
+# Writes pop a user only from the worker that made them, so other workers may serve the old
+# document (account_type included) for up to this long; password hashes are never cached
+USER_CACHE_SECONDS = 5
+USER_CACHE_PROJECTION = {"password_hash": 0}
+user_cache = ExpiringCache(maxsize=5000)
+
+
+async def find_user(user_id: str) -> Optional[dict]:
+    """User document by id, reused for a short while; writes to a user pop it from the cache"""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, USER_CACHE_PROJECTION)
+        if user:
+            user_cache.set(user_id, user, USER_CACHE_SECONDS)
+    return user
+
+
+async def find_users(user_ids: List[str]) -> dict:
+    """User documents keyed by id, with one $in query for the ids not already cached"""
+    users, missing = {}, []
+    for user_id in user_ids:
+        user = user_cache.get(user_id)
+        if user is None:
+            missing.append(user_id)
+        else:
+            users[user_id] = user
+    if missing:
+        async for user in db.users.find({"id": {"$in": missing}}, USER_CACHE_PROJECTION):
+            user_cache.set(user["id"], user, USER_CACHE_SECONDS)
+            users[user["id"]] = user
+    return users
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -192,8 +468,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if not user_id:
         return None
     
-    user = await db.users.find_one({"id": user_id})
-    return user
+    return await find_user(user_id)
 
 
 async def require_auth(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -210,7 +485,7 @@ async def require_auth(credentials: HTTPAuthorizationCredentials = Depends(secur
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = await db.users.find_one({"id": user_id})
+    user = await find_user(user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
@@ -225,7 +500,7 @@ class NotepadEntry(BaseModel):
 
 
 class Notepad(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     code: str = Field(default_factory=generate_memorable_code)
     entries: List[NotepadEntry] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -286,18 +561,23 @@ class NotepadResponse(BaseModel):
     days_remaining: Optional[int] = None
     is_expiring_soon: bool = False
     user_id: Optional[str] = None
+    entry_count: int = 0
+
+
+# Notepad codes are canonicalized once during validation instead of in every handler
+CodeStr = Annotated[str, BeforeValidator(lambda v: v.lower().strip() if isinstance(v, str) else v)]
 
 
 class CodeLookupRequest(BaseModel):
-    code: str
+    code: CodeStr
 
 
 class LinkNotepadRequest(BaseModel):
-    code: str
+    code: CodeStr
 
 
 class BulkLinkRequest(BaseModel):
-    codes: List[str]
+    codes: List[CodeStr]
 
 
 class PasswordChangeRequest(BaseModel):
@@ -323,6 +603,9 @@ class SummarizeRequest(BaseModel):
     max_length: Optional[int] = 500
 
 
+FeedbackStatus = Literal["open", "in_progress", "resolved", "wont_fix"]
+
+
 class FeedbackRequest(BaseModel):
     category: str  # "bug", "feature_request", "missing_feature", "other"
     title: str
@@ -342,12 +625,23 @@ SUBSCRIPTION_PLANS = {
 }
 
 
+# Fire-and-forget tasks; the event loop only keeps weak references, so hold them until done
+background_tasks = set()
+
+
+def run_in_background(coro):
+    """Schedule a coroutine without awaiting it"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
 # ==================== Push Notification Helper ====================
 
-async def send_push_notification(push_token: str, title: str, body: str, data: dict = None):
-    """Send push notification via Expo's push service"""
+async def send_push_notification(push_tokens: List[str], title: str, body: str, data: dict = None):
+    """Send one push notification to every token in a single Expo push request"""
     message = {
-        "to": push_token,
+        "to": push_tokens,
         "sound": "default",
         "title": title,
         "body": body,
@@ -355,24 +649,23 @@ async def send_push_notification(push_token: str, title: str, body: str, data: d
     if data:
         message["data"] = data
     try:
-        async with httpx.AsyncClient() as client_http:
-            await client_http.post(
-                "https://exp.host/--/api/v2/push/send",
-                json=message,
-                headers={"Content-Type": "application/json"}
-            )
+        await http_client.post(
+            "https://exp.host/--/api/v2/push/send",
+            json=message,
+            headers={"Content-Type": "application/json"}
+        )
     except Exception as e:
         logging.getLogger(__name__).warning(f"Push notification failed: {e}")
 
 
 # ==================== Background Cron Job ====================
 
-async def cleanup_cron():
-    """Background task that cleans up expired notepads every 6 hours"""
+async def cleanup_cron(interval_hours: int = 6):
+    """Background task that cleans up expired notepads every `interval_hours`"""
     log = logging.getLogger("cron")
     while True:
         try:
-            await asyncio.sleep(6 * 60 * 60)  # 6 hours
+            await asyncio.sleep(interval_hours * 60 * 60)
             now = datetime.utcnow()
             result = await db.notepads.delete_many({
                 "expires_at": {"$lt": now},
@@ -387,14 +680,15 @@ async def cleanup_cron():
             await asyncio.sleep(60)
 
 
-def build_notepad_response(notepad: dict) -> NotepadResponse:
-    """Build NotepadResponse with expiration info"""
+def resolve_expiration(notepad: dict, now: Optional[datetime] = None):
+    """Return (expires_at, days_remaining, is_expiring_soon), deriving expires_at for legacy notepads"""
+    now = now or datetime.utcnow()
     expires_at = notepad.get("expires_at")
     account_type = notepad.get("account_type", "guest")
-    
+
     # Handle legacy notepads without expires_at
     if expires_at is None and account_type != "premium":
-        created_at = notepad.get("created_at", datetime.utcnow())
+        created_at = notepad.get("created_at", now)
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
         if account_type == "user":
@@ -402,21 +696,33 @@ def build_notepad_response(notepad: dict) -> NotepadResponse:
         else:
             expires_at = created_at + timedelta(days=GUEST_EXPIRATION_DAYS)
     
-    days_remaining = calculate_days_remaining(expires_at) if expires_at else None
+    days_remaining = calculate_days_remaining(expires_at, now) if expires_at else None
     is_expiring_soon = days_remaining is not None and days_remaining <= EXPIRATION_WARNING_DAYS
+    return expires_at, days_remaining, is_expiring_soon
+
+
+def build_notepad_response(notepad: dict, now: Optional[datetime] = None) -> dict:
+    """Build a NotepadResponse-shaped dict with expiration info; list endpoints pass one `now` for every row"""
+    account_type = notepad.get("account_type", "guest")
+    expires_at, days_remaining, is_expiring_soon = resolve_expiration(notepad, now)
     
-    return NotepadResponse(
-        id=notepad.get("id", str(notepad.get("_id", ""))),
-        code=notepad.get("code"),
-        entries=[NotepadEntry(**e) for e in notepad.get("entries", [])],
-        created_at=notepad.get("created_at"),
-        updated_at=notepad.get("updated_at"),
-        account_type=account_type,
-        expires_at=expires_at,
-        days_remaining=days_remaining,
-        is_expiring_soon=is_expiring_soon,
-        user_id=notepad.get("user_id")
-    )
+    entries = notepad.get("entries", [])
+
+    # Documents come from our own writes, so they are returned as plain dicts
+    # for orjson instead of being re-validated through NotepadResponse
+    return {
+        "id": notepad.get("id", str(notepad.get("_id", ""))),
+        "code": notepad.get("code"),
+        "entries": entries,
+        "created_at": notepad.get("created_at"),
+        "updated_at": notepad.get("updated_at"),
+        "account_type": account_type,
+        "expires_at": expires_at,
+        "days_remaining": days_remaining,
+        "is_expiring_soon": is_expiring_soon,
+        "user_id": notepad.get("user_id"),
+        "entry_count": notepad.get("entry_count", len(entries))
+    }
 
 
 # ==================== Auth Routes ====================
@@ -425,10 +731,10 @@ def build_notepad_response(notepad: dict) -> NotepadResponse:
 async def register(data: UserRegister, request: Request):
     """Register a new user account"""
     ip = get_client_ip(request)
-    if rate_limiter.is_rate_limited(f"register:{ip}", max_requests=5, window_seconds=300):
+    if await rate_limiter.is_rate_limited(f"register:{ip}", max_requests=5, window_seconds=300):
         raise HTTPException(status_code=429, detail="Too many registration attempts. Try again in 5 minutes.")
 
-    existing = await db.users.find_one({"email": data.email.lower()})
+    existing = await db.users.find_one({"email": data.email.lower()}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -439,14 +745,14 @@ async def register(data: UserRegister, request: Request):
     # Create user
     user = User(
         email=data.email.lower(),
-        password_hash=get_password_hash(data.password),
+        password_hash=await run_in_threadpool(get_password_hash, data.password),
         name=data.name or data.email.split("@")[0]
     )
     
     await db.users.insert_one(user.dict())
     
     # Create token
-    token = create_access_token({"sub": user.id})
+    token = create_access_token({"sub": user.id, "email": user.email})
     
     return AuthResponse(
         user=UserResponse(
@@ -465,16 +771,16 @@ async def register(data: UserRegister, request: Request):
 async def login(data: UserLogin, request: Request):
     """Login with email and password"""
     ip = get_client_ip(request)
-    if rate_limiter.is_rate_limited(f"login:{ip}", max_requests=10, window_seconds=300):
+    if await rate_limiter.is_rate_limited(f"login:{ip}", max_requests=10, window_seconds=300):
         raise HTTPException(status_code=429, detail="Too many login attempts. Try again in 5 minutes.")
 
     user = await db.users.find_one({"email": data.email.lower()})
     
-    if not user or not verify_password(data.password, user["password_hash"]):
+    if not user or not await run_in_threadpool(verify_password, data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Create token
-    token = create_access_token({"sub": user["id"]})
+    token = create_access_token({"sub": user["id"], "email": user["email"]})
     
     return AuthResponse(
         user=UserResponse(
@@ -504,12 +810,13 @@ async def get_me(user: dict = Depends(require_auth)):
 @api_router.put("/auth/profile", response_model=UserResponse)
 async def update_profile(data: ProfileUpdateRequest, user: dict = Depends(require_auth)):
     """Update user profile"""
-    await db.users.update_one(
+    updated_user = await db.users.find_one_and_update(
         {"id": user["id"]},
-        {"$set": {"name": data.name, "updated_at": datetime.utcnow()}}
+        {"$set": {"name": data.name, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0, "id": 1, "email": 1, "name": 1, "account_type": 1, "created_at": 1},
+        return_document=ReturnDocument.AFTER
     )
-    
-    updated_user = await db.users.find_one({"id": user["id"]})
+    user_cache.pop(user["id"])
     return UserResponse(
         id=updated_user["id"],
         email=updated_user["email"],
@@ -522,7 +829,8 @@ async def update_profile(data: ProfileUpdateRequest, user: dict = Depends(requir
 @api_router.post("/auth/change-password")
 async def change_password(data: PasswordChangeRequest, user: dict = Depends(require_auth)):
     """Change user password"""
-    if not verify_password(data.current_password, user["password_hash"]):
+    stored = await db.users.find_one({"id": user["id"]}, {"_id": 0, "password_hash": 1})
+    if not stored or not await run_in_threadpool(verify_password, data.current_password, stored.get("password_hash", "")):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     if len(data.new_password) < 6:
@@ -530,23 +838,26 @@ async def change_password(data: PasswordChangeRequest, user: dict = Depends(requ
     
     await db.users.update_one(
         {"id": user["id"]},
-        {"$set": {"password_hash": get_password_hash(data.new_password), "updated_at": datetime.utcnow()}}
+        {"$set": {"password_hash": await run_in_threadpool(get_password_hash, data.new_password), "updated_at": datetime.utcnow()}}
     )
+    user_cache.pop(user["id"])
     
     return {"message": "Password changed successfully"}
 
 
 @api_router.get("/auth/notepads", response_model=List[NotepadResponse])
-async def get_user_notepads(user: dict = Depends(require_auth)):
-    """Get all notepads owned by current user"""
-    notepads = await db.notepads.find({"user_id": user["id"]}).to_list(100)
-    return [build_notepad_response(n) for n in notepads]
+async def get_user_notepads(skip: int = 0, limit: int = 100, user: dict = Depends(require_auth)):
+    """Get notepads owned by current user, most recently updated first"""
+    limit = min(max(limit, 1), 100)
+    cursor = db.notepads.find({"user_id": user["id"]}, NOTEPAD_PROJECTION).sort("updated_at", -1).skip(max(skip, 0)).limit(limit)
+    now = datetime.utcnow()
+    return UTCJSONResponse([build_notepad_response(n, now) async for n in cursor])
 
 
 @api_router.post("/auth/link-notepad", response_model=NotepadResponse)
 async def link_notepad(data: LinkNotepadRequest, user: dict = Depends(require_auth)):
     """Link an existing guest notepad to user account"""
-    notepad = await db.notepads.find_one({"code": data.code.lower()})
+    notepad = await db.notepads.find_one({"code": data.code}, {"_id": 0, "code": 1, "user_id": 1})
     
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
@@ -559,8 +870,8 @@ async def link_notepad(data: LinkNotepadRequest, user: dict = Depends(require_au
     # Link notepad to user and extend expiration
     new_expires = get_expiration_date(user.get("account_type", "user"))
     
-    await db.notepads.update_one(
-        {"code": data.code.lower()},
+    updated = await db.notepads.find_one_and_update(
+        {"code": data.code},
         {
             "$set": {
                 "user_id": user["id"],
@@ -568,11 +879,12 @@ async def link_notepad(data: LinkNotepadRequest, user: dict = Depends(require_au
                 "expires_at": new_expires,
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection=NOTEPAD_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
-    
-    updated = await db.notepads.find_one({"code": data.code.lower()})
-    return build_notepad_response(updated)
+    notepad_cache.invalidate(data.code)
+    return UTCJSONResponse(build_notepad_response(updated))
 
 
 @api_router.post("/auth/link-notepads")
@@ -582,20 +894,25 @@ async def bulk_link_notepads(data: BulkLinkRequest, user: dict = Depends(require
     skipped = []
     new_expires = get_expiration_date(user.get("account_type", "user"))
 
+    # One read for every code, then one write for all the linkable ones
+    owners = {
+        n["code"]: n.get("user_id")
+        async for n in db.notepads.find({"code": {"$in": data.codes}}, {"_id": 0, "code": 1, "user_id": 1})
+    }
     for code in data.codes:
-        code_lower = code.lower().strip()
-        notepad = await db.notepads.find_one({"code": code_lower})
-        if not notepad:
-            skipped.append({"code": code_lower, "reason": "not found"})
-            continue
-        if notepad.get("user_id"):
-            if notepad["user_id"] == user["id"]:
-                skipped.append({"code": code_lower, "reason": "already yours"})
-            else:
-                skipped.append({"code": code_lower, "reason": "belongs to another user"})
-            continue
-        await db.notepads.update_one(
-            {"code": code_lower},
+        if code not in owners:
+            skipped.append({"code": code, "reason": "not found"})
+        elif owners[code] == user["id"]:
+            skipped.append({"code": code, "reason": "already yours"})
+        elif owners[code]:
+            skipped.append({"code": code, "reason": "belongs to another user"})
+        else:
+            owners[code] = user["id"]  # A repeated code reports "already yours"
+            linked.append(code)
+
+    if linked:
+        await db.notepads.update_many(
+            {"code": {"$in": linked}, "user_id": None},
             {"$set": {
                 "user_id": user["id"],
                 "account_type": user.get("account_type", "user"),
@@ -603,7 +920,8 @@ async def bulk_link_notepads(data: BulkLinkRequest, user: dict = Depends(require
                 "updated_at": datetime.utcnow()
             }}
         )
-        linked.append(code_lower)
+        for code in linked:
+            notepad_cache.invalidate(code)
 
     return {
         "linked_count": len(linked),
@@ -620,6 +938,7 @@ async def register_push_token(data: PushTokenRequest, user: dict = Depends(requi
         {"id": user["id"]},
         {"$addToSet": {"push_tokens": data.token}}
     )
+    user_cache.pop(user["id"])
     return {"message": "Push token registered"}
 
 
@@ -630,6 +949,7 @@ async def remove_push_token(data: PushTokenRequest, user: dict = Depends(require
         {"id": user["id"]},
         {"$pull": {"push_tokens": data.token}}
     )
+    user_cache.pop(user["id"])
     return {"message": "Push token removed"}
 
 
@@ -683,19 +1003,21 @@ async def fire_webhooks(user_id: str, event: str, payload: dict):
     webhooks = await db.webhooks.find(
         {"user_id": user_id, "active": True, "events": event}
     ).to_list(20)
-    for wh in webhooks:
-        try:
-            async with httpx.AsyncClient(timeout=10) as client_http:
-                await client_http.post(
-                    wh["url"],
-                    json={"event": event, "webhook_id": wh["id"], "data": payload},
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-Webhook-Secret": wh.get("secret", "")
-                    }
-                )
-        except Exception:
-            pass
+    # Deliveries run concurrently so one slow subscriber doesn't hold up the rest
+    results = await asyncio.gather(*(
+        http_client.post(
+            wh["url"],
+            json={"event": event, "webhook_id": wh["id"], "data": payload},
+            headers={
+                "Content-Type": "application/json",
+                "X-Webhook-Secret": wh.get("secret", "")
+            }
+        )
+        for wh in webhooks
+    ), return_exceptions=True)
+    for wh, result in zip(webhooks, results):
+        if isinstance(result, Exception):
+            logging.getLogger(__name__).warning(f"Webhook {wh['id']} delivery failed: {result}")
 
 
 # ==================== Google OAuth Routes ====================
@@ -764,18 +1086,17 @@ async def google_callback():
 async def exchange_google_session(data: GoogleSessionRequest, request: Request):
     """Exchange Emergent Auth session_id for a PasteBridge JWT token"""
     ip = get_client_ip(request)
-    if rate_limiter.is_rate_limited(f"google:{ip}", max_requests=10, window_seconds=300):
+    if await rate_limiter.is_rate_limited(f"google:{ip}", max_requests=10, window_seconds=300):
         raise HTTPException(status_code=429, detail="Too many attempts. Try again later.")
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client_http:
-            resp = await client_http.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-                headers={"X-Session-ID": data.session_id}
-            )
-            if resp.status_code != 200:
-                raise HTTPException(status_code=401, detail="Invalid Google session")
-            google_data = resp.json()
+        resp = await http_client.get(
+            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
+            headers={"X-Session-ID": data.session_id}
+        )
+        if resp.status_code != 200:
+            raise HTTPException(status_code=401, detail="Invalid Google session")
+        google_data = resp.json()
     except httpx.RequestError:
         raise HTTPException(status_code=502, detail="Could not verify Google session")
 
@@ -783,25 +1104,27 @@ async def exchange_google_session(data: GoogleSessionRequest, request: Request):
     name = google_data.get("name", email.split("@")[0])
     picture = google_data.get("picture", "")
 
-    existing = await db.users.find_one({"email": email})
+    now = datetime.utcnow()
+    existing = await db.users.find_one({"email": email}, {"_id": 0, "id": 1, "account_type": 1, "created_at": 1})
     if existing:
         await db.users.update_one({"email": email}, {"$set": {
-            "name": name, "picture": picture, "google_linked": True, "updated_at": datetime.utcnow()
+            "name": name, "picture": picture, "google_linked": True, "updated_at": now
         }})
         user_id = existing["id"]
+        user_cache.pop(user_id)
         account_type = existing.get("account_type", "user")
         created_at = existing["created_at"]
     else:
         user_id = str(uuid.uuid4())
         account_type = "user"
-        created_at = datetime.utcnow()
+        created_at = now
         await db.users.insert_one({
             "id": user_id, "email": email, "name": name, "picture": picture,
             "password_hash": "", "account_type": account_type, "google_linked": True,
-            "created_at": created_at, "updated_at": datetime.utcnow()
+            "created_at": now, "updated_at": now
         })
 
-    token = create_access_token({"sub": user_id})
+    token = create_access_token({"sub": user_id, "email": email})
     return {
         "user": {"id": user_id, "email": email, "name": name, "account_type": account_type, "created_at": str(created_at)},
         "token": token,
@@ -815,10 +1138,12 @@ async def exchange_google_session(data: GoogleSessionRequest, request: Request):
 async def forgot_password(data: PasswordResetRequest, request: Request):
     """Request a password reset token"""
     ip = get_client_ip(request)
-    if rate_limiter.is_rate_limited(f"reset:{ip}", max_requests=3, window_seconds=600):
+    if await rate_limiter.is_rate_limited(f"reset:{ip}", max_requests=3, window_seconds=600):
         raise HTTPException(status_code=429, detail="Too many reset requests. Try again in 10 minutes.")
 
-    user = await db.users.find_one({"email": data.email.lower()})
+    user = await db.users.find_one(
+        {"email": data.email.lower()}, {"_id": 0, "id": 1, "email": 1, "google_linked": 1, "password_hash": 1}
+    )
     if not user:
         return {"message": "If the email exists, a reset link has been generated."}
 
@@ -826,32 +1151,30 @@ async def forgot_password(data: PasswordResetRequest, request: Request):
         return {"message": "This account uses Google sign-in. Please log in with Google."}
 
     reset_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
     await db.password_resets.insert_one({
         "token": reset_token,
         "user_id": user["id"],
         "email": user["email"],
-        "expires_at": datetime.utcnow() + timedelta(hours=1),
+        "expires_at": now + timedelta(hours=1),
         "used": False,
-        "created_at": datetime.utcnow()
+        "created_at": now
     })
 
     return {"message": "If the email exists, a reset link has been generated.", "reset_token": reset_token}
 
 
-@api_router.get("/auth/reset-password", response_class=HTMLResponse)
-async def reset_password_page(token: str = ""):
-    """Password reset web page"""
-    html = f'''<!DOCTYPE html><html><head><title>PasteBridge - Reset Password</title>
+RESET_PASSWORD_PAGE = StaticPage('''<!DOCTYPE html><html><head><title>PasteBridge - Reset Password</title>
     <style>
-    body {{ font-family: -apple-system, sans-serif; background: #0f0f1a; color: #e4e4e7; display: flex; align-items: center; justify-content: center; min-height: 100vh; }}
-    .card {{ background: rgba(255,255,255,0.05); border-radius: 20px; padding: 40px; max-width: 400px; width: 100%; backdrop-filter: blur(10px); border: 1px solid rgba(255,255,255,0.1); }}
-    h2 {{ color: #60a5fa; text-align: center; margin-bottom: 24px; }}
-    input {{ width: 100%; padding: 12px; border-radius: 10px; border: 1px solid rgba(255,255,255,0.15); background: rgba(255,255,255,0.05); color: #e4e4e7; font-size: 1rem; margin-bottom: 12px; box-sizing: border-box; }}
-    button {{ width: 100%; padding: 14px; border-radius: 12px; border: none; background: #3b82f6; color: white; font-weight: 600; font-size: 1rem; cursor: pointer; }}
-    button:hover {{ background: #2563eb; }}
-    .msg {{ text-align: center; margin-top: 16px; }}
-    .err {{ color: #ef4444; }} .ok {{ color: #22c55e; }}
-    a {{ color: #60a5fa; text-decoration: none; }}
+    body { font-family: -apple-system, sans-serif; background: #0f0f1a; color: #e4e4e7; display: flex; align-items: center; justify-content: center; min-height: 100vh; }
+    .card { background: rgba(255,255,255,0.05); border-radius: 20px; padding: 40px; max-width: 400px; width: 100%; backdrop-filter: blur(10px); border: 1px solid rgba(255,255,255,0.1); }
+    h2 { color: #60a5fa; text-align: center; margin-bottom: 24px; }
+    input { width: 100%; padding: 12px; border-radius: 10px; border: 1px solid rgba(255,255,255,0.15); background: rgba(255,255,255,0.05); color: #e4e4e7; font-size: 1rem; margin-bottom: 12px; box-sizing: border-box; }
+    button { width: 100%; padding: 14px; border-radius: 12px; border: none; background: #3b82f6; color: white; font-weight: 600; font-size: 1rem; cursor: pointer; }
+    button:hover { background: #2563eb; }
+    .msg { text-align: center; margin-top: 16px; }
+    .err { color: #ef4444; } .ok { color: #22c55e; }
+    a { color: #60a5fa; text-decoration: none; }
     </style></head><body>
     <div class="card">
     <h2>Reset Password</h2>
@@ -862,24 +1185,29 @@ async def reset_password_page(token: str = ""):
     <p style="text-align:center;margin-top:20px;"><a href="/api/">← Back to PasteBridge</a></p>
     </div>
     <script>
-    async function resetPw() {{
+    async function resetPw() {
         var pw1 = document.getElementById('pw1').value;
         var pw2 = document.getElementById('pw2').value;
         var msg = document.getElementById('msg');
-        if (pw1.length < 6) {{ msg.className = 'msg err'; msg.textContent = 'Password must be at least 6 characters'; return; }}
-        if (pw1 !== pw2) {{ msg.className = 'msg err'; msg.textContent = 'Passwords do not match'; return; }}
-        try {{
-            var r = await fetch('/api/auth/reset-password', {{
-                method: 'POST', headers: {{'Content-Type': 'application/json'}},
-                body: JSON.stringify({{token: '{token}', new_password: pw1}})
-            }});
+        if (pw1.length < 6) { msg.className = 'msg err'; msg.textContent = 'Password must be at least 6 characters'; return; }
+        if (pw1 !== pw2) { msg.className = 'msg err'; msg.textContent = 'Passwords do not match'; return; }
+        try {
+            var r = await fetch('/api/auth/reset-password', {
+                method: 'POST', headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({token: new URLSearchParams(window.location.search).get('token') || '', new_password: pw1})
+            });
             var d = await r.json();
-            if (r.ok) {{ msg.className = 'msg ok'; msg.textContent = 'Password reset! You can now login with your new password.'; }}
-            else {{ msg.className = 'msg err'; msg.textContent = d.detail || 'Reset failed'; }}
-        }} catch(e) {{ msg.className = 'msg err'; msg.textContent = 'Connection error'; }}
-    }}
-    </script></body></html>'''
-    return HTMLResponse(content=html)
+            if (r.ok) { msg.className = 'msg ok'; msg.textContent = 'Password reset! You can now login with your new password.'; }
+            else { msg.className = 'msg err'; msg.textContent = d.detail || 'Reset failed'; }
+        } catch(e) { msg.className = 'msg err'; msg.textContent = 'Connection error'; }
+    }
+    </script></body></html>''')
+
+
+@api_router.get("/auth/reset-password", response_class=HTMLResponse)
+async def reset_password_page(request: Request):
+    """Password reset web page; the token is read client-side from the query string"""
+    return RESET_PASSWORD_PAGE.response(request)
 
 
 @api_router.post("/auth/reset-password")
@@ -889,7 +1217,8 @@ async def reset_password_confirm(data: PasswordResetConfirm):
     if not reset:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
 
-    if datetime.utcnow() > reset["expires_at"]:
+    now = datetime.utcnow()
+    if now > reset["expires_at"]:
         raise HTTPException(status_code=400, detail="Reset token has expired")
 
     if len(data.new_password) < 6:
@@ -897,8 +1226,9 @@ async def reset_password_confirm(data: PasswordResetConfirm):
 
     await db.users.update_one(
         {"id": reset["user_id"]},
-        {"$set": {"password_hash": get_password_hash(data.new_password), "updated_at": datetime.utcnow()}}
+        {"$set": {"password_hash": await run_in_threadpool(get_password_hash, data.new_password), "updated_at": now}}
     )
+    user_cache.pop(reset["user_id"])
     await db.password_resets.update_one({"token": data.token}, {"$set": {"used": True}})
 
     return {"message": "Password reset successfully. You can now login with your new password."}
@@ -909,28 +1239,47 @@ async def reset_password_confirm(data: PasswordResetConfirm):
 @api_router.post("/notepad", response_model=NotepadResponse)
 async def create_notepad(user: dict = Depends(get_current_user)):
     """Create a new notepad session"""
-    for _ in range(10):
-        notepad = Notepad()
-        existing = await db.notepads.find_one({"code": notepad.code})
-        if not existing:
-            break
-        notepad = Notepad()
-    
     # If user is logged in, link notepad to their account
-    if user:
-        notepad.user_id = user["id"]
-        notepad.account_type = user.get("account_type", "user")
-        notepad.expires_at = get_expiration_date(notepad.account_type)
-    
+    account_type = user.get("account_type", "user") if user else "guest"
+    now = datetime.utcnow()
+    notepad = Notepad(
+        created_at=now,
+        updated_at=now,
+        account_type=account_type,
+        expires_at=get_expiration_date(account_type, now),
+        user_id=user["id"] if user else None
+    )
+
+    # The unique index on `code` rejects collisions, so the common case is a single insert.
+    # After a collision, one $in probe over a batch of candidates picks a free code
+    # instead of paying a failed insert per retry. The model is serialized once; retries
+    # only swap the code.
     notepad_dict = notepad.dict()
-    await db.notepads.insert_one(notepad_dict)
-    return build_notepad_response(notepad_dict)
+    for _ in range(5):
+        try:
+            await db.notepads.insert_one(notepad_dict)
+            notepad_cache.invalidate(notepad_dict["code"])
+            return UTCJSONResponse(build_notepad_response(notepad_dict))
+        except DuplicateKeyError:
+            pass
+        candidates = {generate_memorable_code() for _ in range(CODE_CANDIDATE_BATCH)}
+        taken = {
+            n["code"] async for n in db.notepads.find({"code": {"$in": list(candidates)}}, {"_id": 0, "code": 1})
+        }
+        free = candidates - taken
+        notepad_dict["code"] = free.pop() if free else generate_memorable_code()
+
+    raise HTTPException(status_code=503, detail="Could not allocate a notepad code. Please try again.")
+
+
+async def _fetch_notepad(code: str) -> Optional[dict]:
+    return await db.notepads.find_one({"code": code}, NOTEPAD_PROJECTION)
 
 
 @api_router.get("/notepad/{code}", response_model=NotepadResponse)
-async def get_notepad(code: str):
-    """Get notepad content by code"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+async def get_notepad(request: Request, code: CodeStr, after: Optional[datetime] = None):
+    """Get notepad content by code (only entries newer than `after` when given)"""
+    notepad = await notepad_cache.get(code, _fetch_notepad)
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found. Check your code.")
     
@@ -939,14 +1288,30 @@ async def get_notepad(code: str):
     if expires_at and is_expired(expires_at):
         raise HTTPException(status_code=410, detail="This notepad has expired and is no longer available.")
     
-    return build_notepad_response(notepad)
+    # Stored timestamps are naive UTC
+    if after and after.tzinfo:
+        after = after.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    # Polls of an unchanged notepad are answered with a bodiless 304; the body depends on
+    # `after` too, so it is part of the tag
+    days_remaining = resolve_expiration(notepad)[1]
+    etag = f'W/"{notepad["entry_count"]}-{notepad.get("updated_at")}-{days_remaining}-{after}"'.replace(" ", "T")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    if after:
+        # Entries are appended in timestamp order, so filtering the cached tail
+        # matches filtering before the slice
+        notepad = {**notepad, "entries": [e for e in notepad.get("entries", []) if e["timestamp"] > after]}
+    
+    return UTCJSONResponse(build_notepad_response(notepad), headers=headers)
 
 
 @api_router.post("/notepad/lookup", response_model=NotepadResponse)
 async def lookup_notepad(request: CodeLookupRequest):
     """Lookup notepad by code (for the landing page)"""
-    code = request.code.lower().strip()
-    notepad = await db.notepads.find_one({"code": code})
+    notepad = await notepad_cache.get(request.code, _fetch_notepad)
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found. Check your code.")
     
@@ -955,65 +1320,227 @@ async def lookup_notepad(request: CodeLookupRequest):
     if expires_at and is_expired(expires_at):
         raise HTTPException(status_code=410, detail="This notepad has expired and is no longer available.")
     
-    return build_notepad_response(notepad)
+    return UTCJSONResponse(build_notepad_response(notepad))
+
+
+# Only unexpired notepads match; $$NOW is evaluated server-side
+APPENDABLE_FILTER = {"$or": [{"expires_at": None}, {"$expr": {"$gt": ["$expires_at", "$$NOW"]}}]}
+
+
+def append_entries_update(texts: List[str]) -> list:
+    """Pipeline update adding entries stamped with the server's $$NOW, keeping only the newest"""
+    new_entries = [{"text": {"$literal": text}, "timestamp": "$$NOW"} for text in texts]
+    return [{"$set": {
+        "entries": {"$slice": [
+            {"$concatArrays": [{"$ifNull": ["$entries", []]}, new_entries]},
+            -MAX_NOTEPAD_ENTRIES
+        ]},
+        "updated_at": "$$NOW"
+    }}]
+
+
+class AppendBatcher:
+    """Group-commits appends per notepad: texts queued while a notepad's write is in flight go out together.
+
+    Each notepad gets its own short-lived flush task, so a slow or failing write only holds up
+    and fails the callers appending to that notepad.
+    """
+    def __init__(self, max_items: int = 500):
+        self.max_items = max_items
+        self.pending = {}  # code -> [(text, future)] waiting for the next write
+        self.flushing = {}  # code -> task draining that code's pending appends
+
+    async def append(self, code: str, text: str) -> dict:
+        """Resolve to the projected notepad after the write; HTTPException 404/410 if nothing was written"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(code, []).append((text, future))
+        if code not in self.flushing:
+            self.flushing[code] = asyncio.create_task(self._run(code))
+        return await future
+
+    async def _run(self, code: str):
+        batch = []
+        try:
+            while self.pending.get(code):
+                queued = self.pending[code]
+                batch, self.pending[code] = queued[:self.max_items], queued[self.max_items:]
+                if not self.pending[code]:
+                    del self.pending[code]
+                try:
+                    notepad = await self._flush(code, [text for text, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result(notepad)
+        except asyncio.CancelledError:
+            # Shutting down: release everyone still waiting on this notepad
+            for _, future in batch + self.pending.pop(code, []):
+                future.cancel()
+            raise
+        finally:
+            del self.flushing[code]
+
+    async def _flush(self, code: str, texts: List[str]) -> dict:
+        notepad = await db.notepads.find_one_and_update(
+            {"code": code, **APPENDABLE_FILTER},
+            append_entries_update(texts),
+            projection=NOTEPAD_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if notepad:
+            return notepad
+        # Nothing was written; only this path pays for a second lookup to tell 404 from 410.
+        # Expiry is the server's $$NOW verdict, so a skewed app clock can't turn it into a 200.
+        if await db.notepads.find_one({"code": code}, {"_id": 1}):
+            raise HTTPException(status_code=410, detail="This notepad has expired. Please create a new one.")
+        raise HTTPException(status_code=404, detail="Notepad not found")
+
+    def close(self):
+        for task in list(self.flushing.values()):
+            task.cancel()
+
+append_batcher = AppendBatcher()
 
 
 @api_router.post("/notepad/{code}/append", response_model=NotepadResponse)
-async def append_to_notepad(code: str, request: AppendTextRequest):
+async def append_to_notepad(code: CodeStr, request: AppendTextRequest):
     """Append text to notepad"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
-    if not notepad:
-        raise HTTPException(status_code=404, detail="Notepad not found")
-    
-    # Check if expired
-    expires_at = notepad.get("expires_at")
-    if expires_at and is_expired(expires_at):
-        raise HTTPException(status_code=410, detail="This notepad has expired. Please create a new one.")
-    
-    new_entry = NotepadEntry(text=request.text)
-    
-    await db.notepads.update_one(
-        {"code": code.lower()},
-        {
-            "$push": {"entries": new_entry.dict()},
-            "$set": {"updated_at": datetime.utcnow()}
-        }
-    )
-    
-    updated_notepad = await db.notepads.find_one({"code": code.lower()})
+    updated_notepad = await append_batcher.append(code, request.text)
+    notepad_cache.invalidate(code)
 
     # Fire webhooks if notepad has an owner
     owner_id = updated_notepad.get("user_id")
     if owner_id:
-        asyncio.create_task(fire_webhooks(owner_id, "new_entry", {
-            "code": code.lower(),
+        run_in_background(fire_webhooks(owner_id, "new_entry", {
+            "code": code,
             "text": request.text,
-            "entry_count": len(updated_notepad.get("entries", []))
+            "entry_count": updated_notepad["entry_count"]
         }))
 
-    return build_notepad_response(updated_notepad)
+    return UTCJSONResponse(build_notepad_response(updated_notepad))
 
 
 @api_router.delete("/notepad/{code}")
-async def clear_notepad(code: str):
+async def clear_notepad(code: CodeStr):
     """Clear all entries from notepad"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
-    if not notepad:
-        raise HTTPException(status_code=404, detail="Notepad not found")
-    
-    await db.notepads.update_one(
-        {"code": code.lower()},
+    result = await db.notepads.update_one(
+        {"code": code},
         {"$set": {"entries": [], "updated_at": datetime.utcnow()}}
     )
+    notepad_cache.invalidate(code)
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Notepad not found")
     return {"message": "Notepad cleared"}
 
 
+class NotepadUpdateHub:
+    """One change stream per process, fanned out to the notepad streams currently open"""
+    # The server trims each looked-up document to what the page renders before sending it
+    PIPELINE = [
+        {"$match": {"operationType": {"$in": ["update", "replace"]}}},
+        {"$project": {
+            "fullDocument.code": 1,
+            "fullDocument.entries": {"$slice": [{"$ifNull": ["$fullDocument.entries", []]}, -RECENT_ENTRIES_LIMIT]},
+            "fullDocument.entry_count": {"$size": {"$ifNull": ["$fullDocument.entries", []]}},
+            "fullDocument.updated_at": 1,
+        }},
+    ]
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)  # code -> queues of pending SSE payloads
+        self.task = None
+
+    def subscribe(self, code: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers[code].add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._watch())
+        return queue
+
+    def unsubscribe(self, code: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(code)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[code]
+        # Nobody is listening anymore: close the change stream until the next subscriber
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def _publish(self, code: str, message: Optional[bytes]):
+        # Only the latest state matters, so a slow reader's pending payload is replaced
+        for queue in self.subscribers.get(code, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _watch(self):
+        try:
+            async with await db.notepads.watch(self.PIPELINE, full_document="updateLookup", max_await_time_ms=15000) as changes:
+                async for change in changes:
+                    notepad = change.get("fullDocument")
+                    if notepad and notepad.get("code") in self.subscribers:
+                        payload = {
+                            "entries": notepad["entries"],
+                            "entry_count": notepad["entry_count"],
+                            "updated_at": notepad.get("updated_at"),
+                        }
+                        self._publish(notepad["code"], b"data: " + orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC) + b"\n\n")
+        except PyMongoError as e:
+            # Change streams need a replica set
+            logging.getLogger(__name__).warning(f"Notepad stream unavailable: {e}")
+        # None tells every open stream to send the page back to polling
+        for code in list(self.subscribers):
+            self._publish(code, None)
+
+    def close(self):
+        if self.task:
+            self.task.cancel()
+
+notepad_updates = NotepadUpdateHub()
+
+
+@api_router.get("/notepad/{code}/stream")
+async def stream_notepad(code: CodeStr):
+    """Server-Sent Events feed that pushes a notepad's entries whenever it changes"""
+    if not await db.notepads.find_one({"code": code}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Notepad not found")
+
+    async def event_stream():
+        queue = notepad_updates.subscribe(code)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Idle: a comment line keeps proxies from dropping the connection
+                    yield b": ping\n\n"
+                    continue
+                if message is None:
+                    yield b"event: unavailable\ndata: {}\n\n"
+                    return
+                yield message
+        finally:
+            notepad_updates.unsubscribe(code, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ==================== Export & AI Routes ====================
 
 @api_router.get("/notepad/{code}/export")
-async def export_notepad(code: str, format: str = "txt"):
+async def export_notepad(code: CodeStr, format: str = "txt"):
     """Export notepad as txt, md, or json"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+    notepad = await db.notepads.find_one({"code": code}, {"_id": 0, "code": 1, "created_at": 1, "entries": 1})
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
 
@@ -1021,46 +1548,50 @@ async def export_notepad(code: str, format: str = "txt"):
     notepad_code = notepad.get("code")
 
     if format == "json":
+        # orjson writes the stored datetimes directly as ISO 8601 UTC
         export_data = {
             "code": notepad_code,
-            "created_at": str(notepad.get("created_at")),
-            "entries": [{"text": e["text"], "timestamp": str(e["timestamp"])} for e in entries]
+            "created_at": notepad.get("created_at"),
+            "entries": [{"text": e["text"], "timestamp": e["timestamp"]} for e in entries]
         }
-        content = json.dumps(export_data, indent=2)
-        media_type = "application/json"
-        filename = f"{notepad_code}.json"
-    elif format == "md":
-        lines = [f"# PasteBridge: {notepad_code}\n"]
-        for e in entries:
-            ts = e.get("timestamp", "")
-            if isinstance(ts, datetime):
-                ts = ts.strftime("%Y-%m-%d %H:%M:%S")
-            lines.append(f"### {ts}\n{e['text']}\n")
-        content = "\n".join(lines)
+        return Response(
+            content=orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="{notepad_code}.json"'}
+        )
+
+    if format == "md":
+        body = export_lines(f"# PasteBridge: {notepad_code}\n", entries, "### {ts}\n{text}\n")
         media_type = "text/markdown"
         filename = f"{notepad_code}.md"
     else:
-        lines = [f"PasteBridge: {notepad_code}\n{'='*40}\n"]
-        for e in entries:
-            ts = e.get("timestamp", "")
-            if isinstance(ts, datetime):
-                ts = ts.strftime("%Y-%m-%d %H:%M:%S")
-            lines.append(f"[{ts}]\n{e['text']}\n{'-'*40}\n")
-        content = "\n".join(lines)
+        body = export_lines(f"PasteBridge: {notepad_code}\n{'='*40}\n", entries, f"[{{ts}}]\n{{text}}\n{'-'*40}\n")
         media_type = "text/plain"
         filename = f"{notepad_code}.txt"
 
     return StreamingResponse(
-        io.BytesIO(content.encode("utf-8")),
+        body,
         media_type=media_type,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
+async def export_lines(header: str, entries: list, entry_format: str):
+    """Yield an export one encoded entry at a time instead of building the whole file first"""
+    yield header.encode("utf-8")
+    render = ("\n" + entry_format).format
+    for e in entries:
+        ts = e.get("timestamp", "")
+        if isinstance(ts, datetime):
+            # Same text as strftime("%Y-%m-%d %H:%M:%S") without the per-call format parsing
+            ts = ts.isoformat(" ", "seconds")
+        yield render(ts=ts, text=e["text"]).encode("utf-8")
+
+
 @api_router.post("/notepad/{code}/summarize")
-async def summarize_notepad(code: str, request: SummarizeRequest = None):
+async def summarize_notepad(code: CodeStr, request: SummarizeRequest = None):
     """AI-summarize notepad content using GPT-5.2"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+    notepad = await db.notepads.find_one({"code": code}, {"_id": 0, "code": 1, "entries.text": 1})
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
 
@@ -1084,7 +1615,7 @@ async def summarize_notepad(code: str, request: SummarizeRequest = None):
 
         summary = await chat.send_message(UserMessage(text=all_text))
         return {
-            "code": code.lower(),
+            "code": code,
             "summary": summary,
             "entry_count": len(entries),
             "model": "gpt-5.2"
@@ -1098,16 +1629,16 @@ async def summarize_notepad(code: str, request: SummarizeRequest = None):
 # ==================== Collaborative Notepad Routes ====================
 
 @api_router.post("/notepad/{code}/share")
-async def share_notepad(code: str, data: ShareNotepadRequest, user: dict = Depends(require_auth)):
+async def share_notepad(code: CodeStr, data: ShareNotepadRequest, user: dict = Depends(require_auth)):
     """Share a notepad with another user by email"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+    notepad = await db.notepads.find_one({"code": code}, {"_id": 0, "code": 1, "user_id": 1, "collaborators": 1})
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
 
     if notepad.get("user_id") != user["id"]:
         raise HTTPException(status_code=403, detail="Only the owner can share this notepad")
 
-    target_user = await db.users.find_one({"email": data.email.lower()})
+    target_user = await db.users.find_one({"email": data.email.lower()}, {"_id": 0, "id": 1})
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found with that email")
 
@@ -1119,7 +1650,7 @@ async def share_notepad(code: str, data: ShareNotepadRequest, user: dict = Depen
         return {"message": "User already has access", "code": code}
 
     await db.notepads.update_one(
-        {"code": code.lower()},
+        {"code": code},
         {"$addToSet": {"collaborators": target_user["id"]}}
     )
 
@@ -1127,29 +1658,29 @@ async def share_notepad(code: str, data: ShareNotepadRequest, user: dict = Depen
 
 
 @api_router.delete("/notepad/{code}/share/{email}")
-async def unshare_notepad(code: str, email: str, user: dict = Depends(require_auth)):
+async def unshare_notepad(code: CodeStr, email: str, user: dict = Depends(require_auth)):
     """Remove a collaborator from a notepad"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+    notepad = await db.notepads.find_one({"code": code}, {"_id": 0, "code": 1, "user_id": 1})
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
     if notepad.get("user_id") != user["id"]:
         raise HTTPException(status_code=403, detail="Only the owner can manage sharing")
 
-    target_user = await db.users.find_one({"email": email.lower()})
+    target_user = await db.users.find_one({"email": email.lower()}, {"_id": 0, "id": 1})
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     await db.notepads.update_one(
-        {"code": code.lower()},
+        {"code": code},
         {"$pull": {"collaborators": target_user["id"]}}
     )
     return {"message": f"Access removed for {email}"}
 
 
 @api_router.get("/notepad/{code}/collaborators")
-async def get_collaborators(code: str, user: dict = Depends(require_auth)):
+async def get_collaborators(code: CodeStr, user: dict = Depends(require_auth)):
     """List collaborators for a notepad"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
+    notepad = await db.notepads.find_one({"code": code}, {"_id": 0, "code": 1, "user_id": 1, "collaborators": 1})
     if not notepad:
         raise HTTPException(status_code=404, detail="Notepad not found")
 
@@ -1158,13 +1689,13 @@ async def get_collaborators(code: str, user: dict = Depends(require_auth)):
         raise HTTPException(status_code=403, detail="Access denied")
 
     collaborator_ids = notepad.get("collaborators", [])
-    collaborators = []
-    for cid in collaborator_ids:
-        u = await db.users.find_one({"id": cid}, {"_id": 0, "id": 1, "email": 1, "name": 1})
-        if u:
-            collaborators.append(u)
+    users = await find_users([uid for uid in [owner_id, *collaborator_ids] if uid])
+
+    def public_fields(u):
+        return {k: u[k] for k in ("id", "email", "name") if k in u}
 
-    owner = await db.users.find_one({"id": owner_id}, {"_id": 0, "id": 1, "email": 1, "name": 1})
+    collaborators = [public_fields(users[cid]) for cid in collaborator_ids if cid in users]
+    owner = public_fields(users[owner_id]) if owner_id in users else None
     return {"owner": owner, "collaborators": collaborators}
 
 
@@ -1173,9 +1704,10 @@ async def get_shared_notepads(user: dict = Depends(require_auth)):
     """Get notepads shared with the current user"""
     notepads = await db.notepads.find(
         {"collaborators": user["id"]},
-        {"_id": 0}
+        NOTEPAD_PROJECTION
     ).to_list(100)
-    return [build_notepad_response(n) for n in notepads]
+    now = datetime.utcnow()
+    return UTCJSONResponse([build_notepad_response(n, now) for n in notepads])
 
 
 # ==================== Search & Filter ====================
@@ -1191,7 +1723,7 @@ async def search_notepads(data: NotepadSearchRequest, user: dict = Depends(requi
     }
 
     if data.code:
-        query["code"] = {"$regex": data.code.lower(), "$options": "i"}
+        query["code"] = {"$regex": data.code, "$options": "i"}
 
     if data.query:
         query["entries.text"] = {"$regex": data.query, "$options": "i"}
@@ -1215,12 +1747,14 @@ async def search_notepads(data: NotepadSearchRequest, user: dict = Depends(requi
 
     skip = (data.page - 1) * data.limit
     total = await db.notepads.count_documents(query)
-    notepads = await db.notepads.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(data.limit).to_list(data.limit)
+    # Text search counts matches across every entry; otherwise only the recent ones are needed
+    projection = {"_id": 0} if data.query else NOTEPAD_PROJECTION
+    notepads = await db.notepads.find(query, projection).sort("created_at", -1).skip(skip).limit(data.limit).to_list(data.limit)
 
     results = []
+    now = datetime.utcnow()
     for n in notepads:
-        resp = build_notepad_response(n)
-        resp_dict = resp.dict()  # Convert Pydantic model to dict for item assignment
+        resp_dict = build_notepad_response(n, now)
         if data.query:
             matching = [e for e in n.get("entries", []) if data.query.lower() in e.get("text", "").lower()]
             resp_dict["matching_entries"] = len(matching)
@@ -1240,15 +1774,15 @@ async def submit_feedback(data: FeedbackRequest, credentials: HTTPAuthorizationC
     """Submit bug report or feature request (works for guests and authenticated users)"""
     user_id = None
     user_email = None
-    if credentials:
-        try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-            user_obj = await db.users.find_one({"id": user_id})
+    payload = decode_token(credentials.credentials) if credentials else None
+    if payload:
+        user_id = payload.get("sub")
+        user_email = payload.get("email")
+        if not user_email and user_id:
+            # Tokens issued before the email claim was added
+            user_obj = await find_user(user_id)
             if user_obj:
                 user_email = user_obj.get("email")
-        except JWTError:
-            pass
 
     feedback = {
         "id": str(uuid.uuid4()),
@@ -1265,6 +1799,13 @@ async def submit_feedback(data: FeedbackRequest, credentials: HTTPAuthorizationC
     return {"id": feedback["id"], "message": "Feedback submitted. Thank you!"}
 
 
+# Fields the admin dashboard renders for each feedback row
+FEEDBACK_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "category": 1, "severity": 1, "status": 1,
+    "title": 1, "description": 1, "user_email": 1, "created_at": 1,
+}
+
+
 @api_router.get("/admin/feedback")
 async def list_feedback(status: Optional[str] = None, category: Optional[str] = None, page: int = 1, limit: int = 50):
     """List all feedback entries with pagination"""
@@ -1274,9 +1815,12 @@ async def list_feedback(status: Optional[str] = None, category: Optional[str] =
     if category:
         query["category"] = category
     skip = (page - 1) * limit
-    total = await db.feedback.count_documents(query)
-    items = await db.feedback.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    return {"items": items, "total": total, "page": page, "pages": (total + limit - 1) // limit}
+    cursor = db.feedback.find(query, FEEDBACK_LIST_PROJECTION).sort("created_at", -1).skip(skip).limit(limit).batch_size(limit)
+    total, items = await asyncio.gather(db.feedback.count_documents(query), cursor.to_list(limit))
+    return UTCJSONResponse({"items": items, "total": total, "page": page, "pages": (total + limit - 1) // limit})
+
+
+FEEDBACK_SUMMARY_TTL = timedelta(hours=24)
 
 
 @api_router.post("/admin/feedback/summarize")
@@ -1291,6 +1835,15 @@ async def summarize_feedback():
         for f in items
     ])
 
+    # Identical open feedback gets the same summary, so skip the LLM round trip
+    key = hashlib.sha256(orjson.dumps([
+        [f["id"], f["title"], f["description"], f["severity"], f["category"]]
+        for f in sorted(items, key=lambda x: x["id"])
+    ])).hexdigest()
+    cached = await db.feedback_summaries.find_one({"_id": key})
+    if cached and datetime.utcnow() - cached["created_at"] < FEEDBACK_SUMMARY_TTL:
+        return {"summary": cached["summary"], "count": len(items), "model": cached.get("model"), "cached": True}
+
     try:
         llm_key = os.environ.get("EMERGENT_LLM_KEY")
         chat = LlmChat(
@@ -1300,39 +1853,54 @@ async def summarize_feedback():
         ).with_model("openai", "gpt-5.2")
 
         summary = await chat.send_message(UserMessage(text=text_block))
-        return {"summary": summary, "count": len(items), "model": "gpt-5.2"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI summarization failed: {str(e)}")
 
+    await db.feedback_summaries.replace_one(
+        {"_id": key},
+        {"summary": summary, "model": "gpt-5.2", "created_at": datetime.utcnow()},
+        upsert=True,
+    )
+    return {"summary": summary, "count": len(items), "model": "gpt-5.2"}
+
 
 @api_router.patch("/admin/feedback/{feedback_id}")
-async def update_feedback_status(feedback_id: str, status: str):
+async def update_feedback_status(feedback_id: str, status: FeedbackStatus):
     """Update feedback status (open, in_progress, resolved, wont_fix)"""
-    result = await db.feedback.update_one(
+    updated = await db.feedback.find_one_and_update(
         {"id": feedback_id},
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
-    if result.matched_count == 0:
+    if updated is None:
         raise HTTPException(status_code=404, detail="Feedback not found")
-    return {"message": f"Feedback status updated to {status}"}
+    return {"message": f"Feedback status updated to {status}", "feedback": updated}
 
 
 # --- Subscription Routes ---
 
+# The plan listing never changes at runtime, so it is serialized once
+SUBSCRIPTION_PLANS_JSON = orjson.dumps({
+    "free": {"name": "Free", "price": 0, "features": ["5 notepads", "90-day storage", "Basic clipboard sync"]},
+    "pro": {"name": "Pro", "price": 4.99, "features": ["Unlimited notepads", "1-year storage", "AI summarization", "Export (txt/md/json)"]},
+    "business": {"name": "Business", "price": 14.99, "features": ["Unlimited notepads", "Never-expire storage", "AI summarization", "Webhooks & automation", "Priority support"]},
+})
+
+
 @api_router.get("/subscription/plans")
 async def get_subscription_plans():
     """Get available subscription plans"""
-    return {
-        "free": {"name": "Free", "price": 0, "features": ["5 notepads", "90-day storage", "Basic clipboard sync"]},
-        "pro": {"name": "Pro", "price": 4.99, "features": ["Unlimited notepads", "1-year storage", "AI summarization", "Export (txt/md/json)"]},
-        "business": {"name": "Business", "price": 14.99, "features": ["Unlimited notepads", "Never-expire storage", "AI summarization", "Webhooks & automation", "Priority support"]},
-    }
+    return Response(
+        content=SUBSCRIPTION_PLANS_JSON,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=600"}
+    )
 
 
 @api_router.post("/subscription/checkout")
-async def create_subscription_checkout(data: SubscriptionCheckoutRequest, request_obj: "Request" = None, user: dict = Depends(require_auth)):
+async def create_subscription_checkout(data: SubscriptionCheckoutRequest, user: dict = Depends(require_auth)):
     """Create Stripe checkout session for subscription"""
-    from starlette.requests import Request
     plan = SUBSCRIPTION_PLANS.get(data.plan)
     if not plan:
         raise HTTPException(status_code=400, detail="Invalid plan. Choose 'pro' or 'business'")
@@ -1377,79 +1945,142 @@ async def create_subscription_checkout(data: SubscriptionCheckoutRequest, reques
     return {"url": session.url, "session_id": session.session_id}
 
 
+# Per-session locks, so a status poll racing the webhook in this worker waits for the
+# activation to finish instead of reporting "paid" before the account is upgraded
+activation_locks = {}
+
+
+@asynccontextmanager
+async def activation_lock(session_id: str):
+    entry = activation_locks.setdefault(session_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del activation_locks[session_id]
+
+
+async def activate_subscription(user_id: str, plan_name: str, now: datetime):
+    """Upgrade a user and all of their notepads to a paid plan"""
+    plan = SUBSCRIPTION_PLANS.get(plan_name, SUBSCRIPTION_PLANS["pro"])
+    exp_days = plan.get("expiration_days")
+
+    # Upgrade all user's notepads
+    update_fields = {"account_type": plan_name, "updated_at": now}
+    if exp_days:
+        update_fields["expires_at"] = now + timedelta(days=exp_days)
+    else:
+        update_fields["expires_at"] = None  # Never expires for business
+
+    # The two writes touch different collections, so they go out together
+    await asyncio.gather(
+        db.users.update_one(
+            {"id": user_id},
+            {"$set": {
+                "account_type": plan_name,
+                "subscription_plan": plan_name,
+                "subscription_activated_at": now,
+                "updated_at": now
+            }}
+        ),
+        db.notepads.update_many(
+            {"user_id": user_id},
+            {"$set": update_fields}
+        ),
+    )
+    user_cache.pop(user_id)
+    notepad_cache.clear()
+
+
+# A claim that outlives this without finishing (e.g. the worker died mid-activation) can be retaken
+ACTIVATION_LEASE = timedelta(minutes=5)
+
+
+async def activate_session(session_id: str, fields: dict, user_id: Optional[str] = None, plan_name: Optional[str] = None) -> bool:
+    """Claim a paid checkout session, upgrade its user and mark it activated.
+
+    Returns False when the session is already activated or another caller holds the claim.
+    A failed upgrade releases the claim so the next status poll or webhook retry can try again.
+    """
+    now = datetime.utcnow()
+    claimed = await db.payment_transactions.find_one_and_update(
+        {
+            "session_id": session_id,
+            "activated": {"$ne": True},
+            "$or": [{"activating_at": None}, {"activating_at": {"$lt": now - ACTIVATION_LEASE}}],
+        },
+        {"$set": {**fields, "activating_at": now}}
+    )
+    if claimed is None:
+        return False
+    try:
+        await activate_subscription(user_id or claimed["user_id"], plan_name or claimed.get("plan", "pro"), now)
+    except Exception:
+        await db.payment_transactions.update_one({"session_id": session_id}, {"$unset": {"activating_at": ""}})
+        raise
+    await db.payment_transactions.update_one(
+        {"session_id": session_id},
+        {"$set": {"activated": True}, "$unset": {"activating_at": ""}}
+    )
+    return True
+
+
+CHECKOUT_STATUS_CACHE_SECONDS = 600
+checkout_status_cache = ExpiringCache(maxsize=1000)
+
+
 @api_router.get("/subscription/status/{session_id}")
 async def get_subscription_status(session_id: str):
     """Check subscription payment status and activate if paid"""
+    cached = checkout_status_cache.get(session_id)
+    if cached is not None:
+        return cached
+
     stripe_key = os.environ.get("STRIPE_API_KEY")
     stripe_checkout = StripeCheckout(api_key=stripe_key, webhook_url="")
 
     status = await stripe_checkout.get_checkout_status(session_id)
 
-    # Update transaction
-    txn = await db.payment_transactions.find_one({"session_id": session_id})
-    if txn:
-        await db.payment_transactions.update_one(
-            {"session_id": session_id},
-            {"$set": {
-                "payment_status": status.payment_status,
-                "status": status.status,
-                "updated_at": datetime.utcnow()
-            }}
+    # Update transaction; a paid status claims the activation atomically so it runs once
+    fields = {"payment_status": status.payment_status, "status": status.status, "updated_at": datetime.utcnow()}
+    activated = False
+    if status.payment_status == "paid":
+        async with activation_lock(session_id):
+            activated = await activate_session(session_id, fields)
+    if not activated:
+        # Also reports whether an earlier request already finished the activation
+        transaction = await db.payment_transactions.find_one_and_update(
+            {"session_id": session_id}, {"$set": fields}, projection={"_id": 0, "activated": 1}
         )
+        activated = bool(transaction and transaction.get("activated"))
 
-        # Activate subscription if paid and not already activated
-        if status.payment_status == "paid" and not txn.get("activated"):
-            plan_name = txn.get("plan", "pro")
-            plan = SUBSCRIPTION_PLANS.get(plan_name, SUBSCRIPTION_PLANS["pro"])
-            exp_days = plan.get("expiration_days")
-
-            await db.users.update_one(
-                {"id": txn["user_id"]},
-                {"$set": {
-                    "account_type": plan_name,
-                    "subscription_plan": plan_name,
-                    "subscription_activated_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }}
-            )
-
-            # Upgrade all user's notepads
-            update_fields = {"account_type": plan_name, "updated_at": datetime.utcnow()}
-            if exp_days:
-                update_fields["expires_at"] = datetime.utcnow() + timedelta(days=exp_days)
-            else:
-                update_fields["expires_at"] = None  # Never expires for business
-            await db.notepads.update_many(
-                {"user_id": txn["user_id"]},
-                {"$set": update_fields}
-            )
-
-            await db.payment_transactions.update_one(
-                {"session_id": session_id},
-                {"$set": {"activated": True}}
-            )
-
-    return {
+    result = {
         "status": status.status,
         "payment_status": status.payment_status,
         "amount_total": status.amount_total,
         "currency": status.currency
     }
+    # Expired sessions and activated paid ones never change again, so later polls skip Stripe
+    # and Mongo. A paid session another worker is still activating isn't cached: that
+    # activation may fail and release its claim, and the next poll has to retry it.
+    if (status.payment_status == "paid" and activated) or status.status == "expired":
+        checkout_status_cache.set(session_id, result, CHECKOUT_STATUS_CACHE_SECONDS)
+    return result
 
 
-@api_router.get("/subscription/success", response_class=HTMLResponse)
-async def subscription_success_page(session_id: str = ""):
-    """Success page after subscription payment"""
-    html = f'''<!DOCTYPE html><html><head><title>PasteBridge - Payment</title>
+SUBSCRIPTION_SUCCESS_PAGE = StaticPage('''<!DOCTYPE html><html><head><title>PasteBridge - Payment</title>
     <style>
-    body {{ font-family: -apple-system, sans-serif; background: linear-gradient(135deg, #0f0f1a, #1a1a2e); min-height: 100vh; display: flex; align-items: center; justify-content: center; color: #e4e4e7; }}
-    .card {{ background: rgba(255,255,255,0.05); border-radius: 20px; padding: 48px; max-width: 480px; text-align: center; backdrop-filter: blur(10px); border: 1px solid rgba(255,255,255,0.1); }}
-    h1 {{ color: #60a5fa; margin-bottom: 16px; }}
-    .status {{ padding: 12px 24px; border-radius: 8px; margin: 20px 0; font-weight: 600; }}
-    .success {{ background: rgba(34,197,94,0.15); color: #22c55e; }}
-    .pending {{ background: rgba(245,158,11,0.15); color: #fbbf24; }}
-    .error {{ background: rgba(239,68,68,0.15); color: #ef4444; }}
-    a {{ color: #60a5fa; text-decoration: none; }}
+    body { font-family: -apple-system, sans-serif; background: linear-gradient(135deg, #0f0f1a, #1a1a2e); min-height: 100vh; display: flex; align-items: center; justify-content: center; color: #e4e4e7; }
+    .card { background: rgba(255,255,255,0.05); border-radius: 20px; padding: 48px; max-width: 480px; text-align: center; backdrop-filter: blur(10px); border: 1px solid rgba(255,255,255,0.1); }
+    h1 { color: #60a5fa; margin-bottom: 16px; }
+    .status { padding: 12px 24px; border-radius: 8px; margin: 20px 0; font-weight: 600; }
+    .success { background: rgba(34,197,94,0.15); color: #22c55e; }
+    .pending { background: rgba(245,158,11,0.15); color: #fbbf24; }
+    .error { background: rgba(239,68,68,0.15); color: #ef4444; }
+    a { color: #60a5fa; text-decoration: none; }
     </style></head><body><div class="card">
     <h1>PasteBridge</h1>
     <div id="status" class="status pending">Checking payment status...</div>
@@ -1457,38 +2088,40 @@ async def subscription_success_page(session_id: str = ""):
     <p style="margin-top:24px;"><a href="/api/">← Back to PasteBridge</a></p>
     </div>
     <script>
-    async function pollStatus(sid, attempts) {{
-        if (attempts >= 8) {{ document.getElementById('status').textContent = 'Timed out. Check your account.'; return; }}
-        try {{
+    async function pollStatus(sid, attempts) {
+        if (attempts >= 8) { document.getElementById('status').textContent = 'Timed out. Check your account.'; return; }
+        try {
             var r = await fetch('/api/subscription/status/' + sid);
             var d = await r.json();
-            if (d.payment_status === 'paid') {{
+            if (d.payment_status === 'paid') {
                 document.getElementById('status').className = 'status success';
                 document.getElementById('status').textContent = 'Payment Successful!';
                 document.getElementById('message').textContent = 'Your subscription is now active. Open the PasteBridge app to enjoy your new features.';
                 return;
-            }} else if (d.status === 'expired') {{
+            } else if (d.status === 'expired') {
                 document.getElementById('status').className = 'status error';
                 document.getElementById('status').textContent = 'Session expired';
                 return;
-            }}
-            setTimeout(function() {{ pollStatus(sid, attempts + 1); }}, 2000);
-        }} catch(e) {{
+            }
+            setTimeout(function() { pollStatus(sid, attempts + 1); }, 2000);
+        } catch(e) {
             document.getElementById('status').className = 'status error';
             document.getElementById('status').textContent = 'Error checking status';
-        }}
-    }}
+        }
+    }
     var sid = new URLSearchParams(window.location.search).get('session_id');
-    if (sid) {{ pollStatus(sid, 0); }}
-    else {{ document.getElementById('status').textContent = 'No session found'; }}
-    </script></body></html>'''
-    return HTMLResponse(content=html)
+    if (sid) { pollStatus(sid, 0); }
+    else { document.getElementById('status').textContent = 'No session found'; }
+    </script></body></html>''')
 
 
-@api_router.get("/subscription/plans-page", response_class=HTMLResponse)
-async def plans_page():
-    """Web page showing subscription plans"""
-    html = '''<!DOCTYPE html><html><head><title>PasteBridge - Plans</title>
+@api_router.get("/subscription/success", response_class=HTMLResponse)
+async def subscription_success_page(request: Request):
+    """Success page after subscription payment; the session ID is read client-side"""
+    return SUBSCRIPTION_SUCCESS_PAGE.response(request)
+
+
+PLANS_PAGE = StaticPage('''<!DOCTYPE html><html><head><title>PasteBridge - Plans</title>
     <style>
     body { font-family: -apple-system, sans-serif; background: linear-gradient(135deg, #0f0f1a, #1a1a2e); min-height: 100vh; color: #e4e4e7; padding: 40px 20px; }
     .container { max-width: 900px; margin: 0 auto; text-align: center; }
@@ -1522,14 +2155,21 @@ async def plans_page():
     <div style="text-align:center;color:#a1a1aa;font-size:0.85rem;">Upgrade from the app</div></div>
     </div>
     <div class="back"><a href="/api/">← Back to PasteBridge</a></div>
-    </div></body></html>'''
-    return HTMLResponse(content=html)
+    </div></body></html>''')
+
+
+@api_router.get("/subscription/plans-page", response_class=HTMLResponse)
+async def plans_page(request: Request):
+    """Web page showing subscription plans"""
+    return PLANS_PAGE.response(request)
+
+
+STRIPE_EVENT_RETENTION_SECONDS = 7 * 24 * 3600  # Longer than Stripe's retry window
 
 
 @api_router.post("/webhook/stripe")
-async def stripe_webhook(request: "Request"):
+async def stripe_webhook(request: Request):
     """Handle Stripe webhook events"""
-    from starlette.requests import Request
     body = await request.body()
     sig = request.headers.get("Stripe-Signature", "")
 
@@ -1538,41 +2178,37 @@ async def stripe_webhook(request: "Request"):
 
     try:
         event = await stripe_checkout.handle_webhook(body, sig)
-        if event.payment_status == "paid":
-            txn = await db.payment_transactions.find_one({"session_id": event.session_id})
-            if txn and not txn.get("activated"):
-                plan_name = event.metadata.get("plan", "pro")
-                plan = SUBSCRIPTION_PLANS.get(plan_name, SUBSCRIPTION_PLANS["pro"])
-                exp_days = plan.get("expiration_days")
-
-                await db.users.update_one(
-                    {"id": event.metadata.get("user_id")},
-                    {"$set": {
-                        "account_type": plan_name,
-                        "subscription_plan": plan_name,
-                        "subscription_activated_at": datetime.utcnow()
-                    }}
-                )
-
-                update_fields = {"account_type": plan_name}
-                if exp_days:
-                    update_fields["expires_at"] = datetime.utcnow() + timedelta(days=exp_days)
-                else:
-                    update_fields["expires_at"] = None
-                await db.notepads.update_many(
-                    {"user_id": event.metadata.get("user_id")},
-                    {"$set": update_fields}
-                )
-
-                await db.payment_transactions.update_one(
-                    {"session_id": event.session_id},
-                    {"$set": {"activated": True, "payment_status": "paid"}}
-                )
-        return {"status": "ok"}
     except Exception as e:
         logging.getLogger(__name__).error(f"Webhook error: {e}")
         return {"status": "error"}
 
+    # Stripe redelivers events; repeats of one already processed are acknowledged straight away
+    event_id = getattr(event, "event_id", None) or getattr(event, "id", None)
+    if event_id and await db.stripe_events.find_one({"_id": event_id}, {"_id": 1}):
+        return {"status": "ok", "deduped": True}
+
+    if event.payment_status == "paid":
+        # Activate before acknowledging: a non-2xx answer is what makes Stripe retry a failed event
+        try:
+            async with activation_lock(event.session_id):
+                await activate_session(
+                    event.session_id,
+                    {"payment_status": "paid", "updated_at": datetime.utcnow()},
+                    event.metadata.get("user_id"),
+                    event.metadata.get("plan", "pro")
+                )
+        except Exception:
+            logging.getLogger(__name__).exception(f"Webhook activation failed for session {event.session_id}")
+            return UTCJSONResponse({"status": "error"}, status_code=500)
+
+    # Only a successfully processed event is recorded, so a failed one is still retried
+    if event_id:
+        try:
+            await db.stripe_events.insert_one({"_id": event_id, "created_at": datetime.utcnow()})
+        except DuplicateKeyError:
+            pass  # A concurrent delivery of the same event finished first
+    return {"status": "ok"}
+
 
 # --- Admin Stats ---
 
@@ -1593,22 +2229,22 @@ async def cleanup_expired_notepads():
 @api_router.get("/admin/stats")
 async def get_stats():
     """Get notepad statistics"""
-    total = await db.notepads.count_documents({})
-    guest = await db.notepads.count_documents({"account_type": "guest"})
-    user_notepads = await db.notepads.count_documents({"account_type": "user"})
-    total_users = await db.users.count_documents({})
-    
     now = datetime.utcnow()
-    expiring_soon = await db.notepads.count_documents({
-        "expires_at": {
-            "$gt": now,
-            "$lt": now + timedelta(days=EXPIRATION_WARNING_DAYS)
-        }
-    })
-    expired = await db.notepads.count_documents({
-        "expires_at": {"$lt": now}
-    })
-    
+    # Separate counts so each filter can use its own index; they run concurrently
+    total, guest, user_notepads, total_users, expiring_soon, expired = await asyncio.gather(
+        db.notepads.count_documents({}),
+        db.notepads.count_documents({"account_type": "guest"}),
+        db.notepads.count_documents({"account_type": "user"}),
+        db.users.count_documents({}),
+        db.notepads.count_documents({
+            "expires_at": {
+                "$gt": now,
+                "$lt": now + timedelta(days=EXPIRATION_WARNING_DAYS)
+            }
+        }),
+        db.notepads.count_documents({"expires_at": {"$lt": now}}),
+    )
+
     return {
         "total_notepads": total,
         "guest_notepads": guest,
@@ -1797,7 +2433,7 @@ async def analytics_data():
         }},
         {"$sort": {"_id": 1}}
     ]
-    entries_by_day = await db.notepads.aggregate(entries_pipeline).to_list(31)
+    entries_by_day = await (await db.notepads.aggregate(entries_pipeline)).to_list(31)
 
     # New users per day (last 30 days)
     users_pipeline = [
@@ -1808,7 +2444,7 @@ async def analytics_data():
         }},
         {"$sort": {"_id": 1}}
     ]
-    users_by_day = await db.users.aggregate(users_pipeline).to_list(31)
+    users_by_day = await (await db.users.aggregate(users_pipeline)).to_list(31)
 
     # Top notepads by entry count
     top_pipeline = [
@@ -1816,14 +2452,14 @@ async def analytics_data():
         {"$sort": {"entry_count": -1}},
         {"$limit": 10}
     ]
-    top_notepads = await db.notepads.aggregate(top_pipeline).to_list(10)
+    top_notepads = await (await db.notepads.aggregate(top_pipeline)).to_list(10)
 
     # Overall stats
     total_users = await db.users.count_documents({})
     total_notepads = await db.notepads.count_documents({})
     total_entries = 0
     entry_count_pipeline = [{"$project": {"c": {"$size": {"$ifNull": ["$entries", []]}}}}, {"$group": {"_id": None, "total": {"$sum": "$c"}}}]
-    result = await db.notepads.aggregate(entry_count_pipeline).to_list(1)
+    result = await (await db.notepads.aggregate(entry_count_pipeline)).to_list(1)
     if result:
         total_entries = result[0]["total"]
 
@@ -1921,10 +2557,7 @@ async def analytics_page():
 
 # ==================== Web Pages ====================
 
-@api_router.get("/", response_class=HTMLResponse)
-async def landing_page():
-    """Landing page where users enter their code"""
-    html_content = '''<!DOCTYPE html>
+LANDING_PAGE = StaticPage('''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -1999,11 +2632,11 @@ async def landing_page():
         <div class="card">
             <h2>Enter your notepad code</h2>
             <form id="codeForm" onsubmit="handleSubmit(event)">
-                <input type="text" id="codeInput" class="code-input" placeholder="redtiger42" autocomplete="off" autocapitalize="none" spellcheck="false" />
+                <input type="text" id="codeInput" class="code-input" placeholder="redtiger427" autocomplete="off" autocapitalize="none" spellcheck="false" />
                 <button type="submit" class="submit-btn">View Notepad</button>
             </form>
             <p id="error" class="error"></p>
-            <p class="example">Example: <code>suntiger42</code></p>
+            <p class="example">Example: <code>bluefox123</code></p>
         </div>
         <p class="footer">Get the code from the PasteBridge app on your phone</p>
     </div>
@@ -2031,255 +2664,398 @@ async def landing_page():
         document.getElementById('codeInput').focus();
     </script>
 </body>
-</html>'''
-    return HTMLResponse(content=html_content)
+</html>''')
 
 
-@api_router.get("/notepad/{code}/view", response_class=HTMLResponse)
-async def view_notepad(code: str):
-    """Web view of notepad"""
-    notepad = await db.notepads.find_one({"code": code.lower()})
-    if not notepad:
-        return HTMLResponse(
-            content='''<!DOCTYPE html><html><head><title>Not Found</title>
+@api_router.get("/", response_class=HTMLResponse)
+async def landing_page(request: Request):
+    """Landing page where users enter their code"""
+    return LANDING_PAGE.response(request)
+
+
+# Error pages for the view route, encoded once
+VIEW_NOT_FOUND_HTML = '''<!DOCTYPE html><html><head><title>Not Found</title>
             <style>body{font-family:sans-serif;display:flex;align-items:center;justify-content:center;min-height:100vh;background:#0f0f1a;color:#fff;}
             .container{text-align:center;}h1{color:#ef4444;}a{color:#60a5fa;}</style></head>
             <body><div class="container"><h1>Notepad not found</h1><p>Check your code and try again.</p>
-            <p><a href="/api/">← Back to home</a></p></div></body></html>''',
-            status_code=404
-        )
+            <p><a href="/api/">← Back to home</a></p></div></body></html>'''.encode("utf-8")
 
-    # Send push notification to notepad owner
-    owner_id = notepad.get("user_id")
-    if owner_id:
-        owner = await db.users.find_one({"id": owner_id})
-        if owner:
-            for push_token in owner.get("push_tokens", []):
-                asyncio.create_task(send_push_notification(
-                    push_token,
-                    "Notepad Viewed",
-                    f"Someone is viewing your notepad '{code}'",
-                    {"code": code, "event": "view"}
-                ))
-    
-    expires_at = notepad.get("expires_at")
-    if expires_at and is_expired(expires_at):
-        return HTMLResponse(
-            content='''<!DOCTYPE html><html><head><title>Expired</title>
+VIEW_EXPIRED_HTML = '''<!DOCTYPE html><html><head><title>Expired</title>
             <style>body{font-family:sans-serif;display:flex;align-items:center;justify-content:center;min-height:100vh;background:#0f0f1a;color:#fff;}
             .container{text-align:center;max-width:400px;}.icon{font-size:4rem;margin-bottom:16px;}h1{color:#f59e0b;margin-bottom:12px;}
             p{color:#a1a1aa;margin-bottom:8px;}a{color:#60a5fa;}</style></head>
             <body><div class="container"><div class="icon">⏰</div><h1>Notepad Expired</h1>
             <p>This notepad has expired. Guest notepads are available for 90 days.</p>
             <p>Create a new notepad from the app to continue.</p>
-            <p><a href="/api/">← Back to home</a></p></div></body></html>''',
-            status_code=410
-        )
-    
-    notepad_code = notepad.get("code")
-    account_type = notepad.get("account_type", "guest")
-    
-    if expires_at is None and account_type != "premium":
-        created_at = notepad.get("created_at", datetime.utcnow())
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-        if account_type == "user":
-            expires_at = created_at + timedelta(days=USER_EXPIRATION_DAYS)
-        else:
-            expires_at = created_at + timedelta(days=GUEST_EXPIRATION_DAYS)
-    
-    days_remaining = calculate_days_remaining(expires_at) if expires_at else None
-    is_expiring_soon = days_remaining is not None and days_remaining <= EXPIRATION_WARNING_DAYS
-    
-    if expires_at:
-        expiration_date_str = expires_at.strftime("%B %d, %Y")
-        if is_expiring_soon:
-            expiration_banner = f'''<div class="expiration-banner warning">
-                <span class="expiration-icon">⚠️</span>
-                <span>Expires in {days_remaining} day{"s" if days_remaining != 1 else ""} ({expiration_date_str})</span>
-            </div>'''
-        else:
-            expiration_banner = f'''<div class="expiration-banner">
-                <span class="expiration-icon">📅</span>
-                <span>Expires {expiration_date_str} ({days_remaining} days)</span>
-            </div>'''
-    else:
-        expiration_banner = '''<div class="expiration-banner premium">
-            <span class="expiration-icon">⭐</span>
-            <span>Premium notepad - Never expires</span>
-        </div>'''
-    
-    entries_html = ""
-    for entry in reversed(notepad.get("entries", [])):
-        timestamp = entry.get("timestamp", datetime.utcnow())
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        time_str = timestamp.strftime("%H:%M:%S")
-        text = entry.get("text", "")
-        text_display = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;").replace("\n", "<br>")
-        text_data = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;").replace("'", "&#39;")
-        entries_html += f'''<div class="entry">
-            <div class="entry-header">
-                <span class="timestamp">{time_str}</span>
-                <button class="copy-btn" data-text="{text_data}" onclick="copyFromData(this)">Copy</button>
-            </div>
-            <div class="text">{text_display}</div>
-        </div>'''
-    
-    if not entries_html:
-        entries_html = '''<div class="empty" id="emptyState">
-            <div class="empty-icon">📋</div>
-            <p>No entries yet</p>
-            <p style="font-size: 0.9rem; color: #52525b;">Copy text on your phone and tap the capture button</p>
-        </div>'''
-    
-    entry_count = len(notepad.get("entries", []))
-    
-    html_content = f'''<!DOCTYPE html>
+            <p><a href="/api/">← Back to home</a></p></div></body></html>'''.encode("utf-8")
+
+# The view page's stylesheet and script are served under content-hashed names, so
+# browsers cache them for good and only the small per-notepad HTML is fetched per view
+VIEW_CSS = StaticPage('''* { box-sizing: border-box; margin: 0; padding: 0; }
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    background: linear-gradient(135deg, #0f0f1a 0%, #1a1a2e 100%);
+    min-height: 100vh;
+    color: #e4e4e7;
+    padding: 20px;
+}
+.container { max-width: 800px; margin: 0 auto; }
+.header {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    padding: 20px 0;
+    border-bottom: 1px solid rgba(255,255,255,0.1);
+    margin-bottom: 16px;
+}
+.header-left h1 { font-size: 1.5rem; color: #60a5fa; margin-bottom: 4px; }
+.code-badge {
+    display: inline-flex;
+    align-items: center;
+    gap: 8px;
+    font-family: 'SF Mono', Monaco, monospace;
+    background: rgba(96, 165, 250, 0.15);
+    padding: 8px 16px;
+    border-radius: 20px;
+    font-size: 1.1rem;
+    color: #60a5fa;
+    font-weight: 600;
+}
+.expiration-banner {
+    display: flex;
+    align-items: center;
+    gap: 8px;
+    padding: 10px 16px;
+    background: rgba(255,255,255,0.05);
+    border-radius: 8px;
+    font-size: 0.85rem;
+    color: #a1a1aa;
+    margin-bottom: 16px;
+}
+.expiration-banner.warning {
+    background: rgba(245, 158, 11, 0.15);
+    color: #fbbf24;
+    border: 1px solid rgba(245, 158, 11, 0.3);
+}
+.expiration-banner.premium {
+    background: rgba(168, 85, 247, 0.15);
+    color: #c084fc;
+    border: 1px solid rgba(168, 85, 247, 0.3);
+}
+.expiration-icon { font-size: 1rem; }
+.status {
+    display: flex;
+    align-items: center;
+    gap: 8px;
+    font-size: 0.85rem;
+    color: #71717a;
+    margin-bottom: 20px;
+}
+.status .dot {
+    width: 8px;
+    height: 8px;
+    background: #22c55e;
+    border-radius: 50%;
+    animation: pulse 2s infinite;
+}
+@keyframes pulse { 0%, 100% { opacity: 1; } 50% { opacity: 0.5; } }
+.stats { text-align: right; }
+.stats .count { font-size: 1.5rem; font-weight: 700; color: #ffffff; }
+.stats .label { font-size: 0.8rem; color: #71717a; }
+.entries { display: flex; flex-direction: column; gap: 12px; }
+.entry {
+    background: rgba(255,255,255,0.05);
+    border-radius: 12px;
+    padding: 16px;
+    border-left: 3px solid #60a5fa;
+}
+.entry-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px; }
+.timestamp { font-size: 0.75rem; color: #71717a; font-family: monospace; }
+.copy-btn {
+    background: rgba(96, 165, 250, 0.2);
+    border: none;
+    color: #60a5fa;
+    padding: 4px 12px;
+    border-radius: 6px;
+    font-size: 0.75rem;
+    cursor: pointer;
+}
+.copy-btn:hover { background: rgba(96, 165, 250, 0.3); }
+.copy-btn.copied { background: #22c55e; color: white; }
+.text { font-size: 1rem; line-height: 1.6; word-break: break-word; white-space: pre-wrap; color: #f4f4f5; }
+.empty { text-align: center; padding: 80px 20px; color: #71717a; }
+.empty-icon { font-size: 4rem; margin-bottom: 16px; opacity: 0.5; }
+.empty p { font-size: 1.2rem; margin-bottom: 8px; }
+.back-link { display: inline-block; margin-top: 24px; color: #60a5fa; text-decoration: none; font-size: 0.9rem; }
+.back-link:hover { text-decoration: underline; }
+.summarize-section { margin: 20px 0; }
+.summarize-btn {
+    background: linear-gradient(135deg, #8b5cf6, #6366f1);
+    border: none; color: white; padding: 10px 20px; border-radius: 10px;
+    font-size: 0.9rem; font-weight: 600; cursor: pointer; display: inline-flex;
+    align-items: center; gap: 8px; transition: opacity 0.2s;
+}
+.summarize-btn:hover { opacity: 0.85; }
+.summarize-btn:disabled { opacity: 0.5; cursor: not-allowed; }
+.summary-box {
+    background: rgba(139,92,246,0.1); border: 1px solid rgba(139,92,246,0.25);
+    border-radius: 12px; padding: 20px; margin-top: 12px; display: none;
+    line-height: 1.6; color: #d4d4d8; font-size: 0.95rem; white-space: pre-wrap;
+}
+.summary-box.show { display: block; }
+.export-btns { display: flex; gap: 8px; margin: 16px 0; flex-wrap: wrap; }
+.export-btn {
+    background: rgba(255,255,255,0.08); border: 1px solid rgba(255,255,255,0.15);
+    color: #a1a1aa; padding: 6px 14px; border-radius: 8px; font-size: 0.8rem;
+    cursor: pointer; text-decoration: none; transition: all 0.2s;
+}
+.export-btn:hover { background: rgba(255,255,255,0.15); color: #e4e4e7; }
+''', max_age=31536000, media_type="text/css; charset=utf-8", immutable=True)
+
+VIEW_JS = StaticPage('''// The page embeds its code and first entries as JSON, so this script stays static
+var initial = JSON.parse(document.getElementById('initialData').textContent);
+var CODE = initial.code;
+
+function copyText(btn, text) {
+    navigator.clipboard.writeText(text).then(function() {
+        btn.textContent = 'Copied!';
+        btn.classList.add('copied');
+        setTimeout(function() {
+            btn.textContent = 'Copy';
+            btn.classList.remove('copied');
+        }, 2000);
+    });
+}
+
+function formatTime(ts) {
+    var d = new Date(ts);
+    return d.toLocaleTimeString('en-US', { hour12: false });
+}
+
+// Entries are cloned from a <template> and filled through textContent, so entry text
+// is never parsed as HTML and needs no escaping
+var entryTemplate = document.getElementById('entryTpl');
+function buildEntryNode(entry) {
+    var node = entryTemplate.content.cloneNode(true);
+    var btn = node.querySelector('.copy-btn');
+    node.querySelector('.timestamp').textContent = formatTime(entry.timestamp);
+    node.querySelector('.text').textContent = entry.text;
+    btn.onclick = function() { copyText(btn, entry.text); };
+    return node;
+}
+
+var lastVersion = null, lastTimestamp = null;
+function renderEntries(data) {
+    var entries = data.entries;
+    var container = document.getElementById('entriesContainer');
+    document.getElementById('entryCount').textContent = data.entry_count;
+
+    // updated_at moves on every write, even once entry_count is pinned at the notepad's cap
+    if (data.updated_at === lastVersion) { return; }
+    lastVersion = data.updated_at;
+
+    if (!entries.length) {
+        container.innerHTML = '<div class="empty"><div class="empty-icon">📋</div><p>No entries yet</p><p style="font-size:0.9rem;color:#52525b;">Copy text on your phone and tap the capture button</p></div>';
+        lastTimestamp = null;
+        return;
+    }
+
+    var frag = document.createDocumentFragment();
+    // Entries written by one batch share a timestamp, so the newest rendered entry is only
+    // located when its timestamp is unique; otherwise the list is rebuilt
+    var known = -1, matches = 0;
+    for (var i = 0; lastTimestamp !== null && i < entries.length; i++) {
+        if (entries[i].timestamp === lastTimestamp) { known = i; matches++; }
+    }
+    if (matches === 1) {
+        // The newest rendered entry is still there: build just the ones after it and drop the overflow
+        for (var i = entries.length - 1; i > known; i--) {
+            frag.appendChild(buildEntryNode(entries[i]));
+        }
+        container.prepend(frag);
+        while (container.children.length > initial.limit) {
+            container.removeChild(container.lastElementChild);
+        }
+    } else {
+        var first = Math.max(0, entries.length - initial.limit);
+        for (var i = entries.length - 1; i >= first; i--) {
+            frag.appendChild(buildEntryNode(entries[i]));
+        }
+        container.replaceChildren(frag);
+    }
+    lastTimestamp = entries[entries.length - 1].timestamp;
+}
+
+// Updates arriving within one frame collapse into a single render of the latest state;
+// hidden tabs don't run frames, so they render once when shown again
+var pendingUpdate = null, renderFrame = 0;
+function scheduleRender(data) {
+    pendingUpdate = data;
+    if (!renderFrame) { renderFrame = requestAnimationFrame(flushRender); }
+}
+
+function flushRender() {
+    var update = pendingUpdate;
+    renderFrame = 0;
+    pendingUpdate = null;
+    renderEntries(update);
+}
+
+// Polling backs off while nothing changes and resets as soon as something does
+var POLL_MIN_MS = 3000, POLL_MAX_MS = 60000, HIDDEN_PAUSE_MS = 5 * 60 * 1000;
+var polling = false, pollDelay = POLL_MIN_MS, pollTimer = null, hiddenSince = null;
+var polledVersion = initial.updated_at;
+
+function schedulePoll() {
+    clearTimeout(pollTimer);
+    pollTimer = null;
+    // A tab hidden for a while stops polling until it is shown again
+    if (hiddenSince !== null && Date.now() - hiddenSince > HIDDEN_PAUSE_MS) { return; }
+    pollTimer = setTimeout(poll, pollDelay);
+}
+
+function poll() {
+    fetch('/api/notepad/' + CODE)
+        .then(function(r) { 
+            if (r.status === 410) {
+                document.getElementById('statusText').textContent = 'Notepad expired';
+                polling = false;
+                return null;
+            }
+            return r.json(); 
+        })
+        .then(function(data) {
+            if (data) {
+                var changed = data.updated_at !== polledVersion;
+                polledVersion = data.updated_at;
+                scheduleRender(data);
+                document.getElementById('statusText').textContent = 'Live updating';
+                pollDelay = changed ? POLL_MIN_MS : Math.min(pollDelay * 2, POLL_MAX_MS);
+                schedulePoll();
+            }
+        })
+        .catch(function() {
+            document.getElementById('statusText').textContent = 'Reconnecting...';
+            pollDelay = Math.min(pollDelay * 2, POLL_MAX_MS);
+            schedulePoll();
+        });
+}
+
+// First paint renders from the JSON embedded by the server, with no extra request
+renderEntries(initial);
+
+function startPolling() {
+    if (!polling) {
+        polling = true;
+        schedulePoll();
+    }
+}
+
+document.addEventListener('visibilitychange', function() {
+    if (document.hidden) {
+        hiddenSince = Date.now();
+        return;
+    }
+    hiddenSince = null;
+    if (polling) {
+        pollDelay = POLL_MIN_MS;
+        clearTimeout(pollTimer);
+        poll();
+    }
+});
+
+// Prefer pushed updates; fall back to polling when streaming is unavailable
+if (window.EventSource) {
+    var stream = new EventSource('/api/notepad/' + CODE + '/stream');
+    stream.onmessage = function(e) {
+        scheduleRender(JSON.parse(e.data));
+        document.getElementById('statusText').textContent = 'Live updating';
+    };
+    stream.addEventListener('unavailable', function() {
+        stream.close();
+        startPolling();
+    });
+    stream.onerror = function() {
+        if (stream.readyState === EventSource.CLOSED) {
+            startPolling();
+        }
+        else {
+            document.getElementById('statusText').textContent = 'Reconnecting...';
+        }
+    };
+}
+else {
+    startPolling();
+}
+
+async function summarizeNotepad() {
+    var btn = document.getElementById('summarizeBtn');
+    var box = document.getElementById('summaryBox');
+    btn.disabled = true;
+    btn.textContent = 'Summarizing...';
+    box.className = 'summary-box show';
+    box.textContent = 'Analyzing content with AI...';
+    try {
+        var r = await fetch('/api/notepad/' + CODE + '/summarize', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({max_length: 500})
+        });
+        var d = await r.json();
+        if (r.ok) {
+            box.textContent = d.summary;
+        } else {
+            box.textContent = d.detail || 'Summarization failed';
+        }
+    } catch(e) {
+        box.textContent = 'Error connecting to AI service';
+    }
+    btn.disabled = false;
+    btn.textContent = 'AI Summarize';
+}
+''', max_age=31536000, media_type="text/javascript; charset=utf-8", immutable=True)
+
+STATIC_ASSETS = {
+    f"view.{VIEW_CSS.version}.css": VIEW_CSS,
+    f"view.{VIEW_JS.version}.js": VIEW_JS,
+}
+VIEW_CSS_NAME, VIEW_JS_NAME = STATIC_ASSETS
+
+
+@api_router.get("/static/{name}")
+async def static_asset(request: Request, name: str):
+    """Content-hashed CSS/JS for the server-rendered pages"""
+    asset = STATIC_ASSETS.get(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return asset.response(request)
+
+
+VIEW_PAGE = PageTemplate('''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>PasteBridge - {notepad_code}</title>
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #0f0f1a 0%, #1a1a2e 100%);
-            min-height: 100vh;
-            color: #e4e4e7;
-            padding: 20px;
-        }}
-        .container {{ max-width: 800px; margin: 0 auto; }}
-        .header {{
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 20px 0;
-            border-bottom: 1px solid rgba(255,255,255,0.1);
-            margin-bottom: 16px;
-        }}
-        .header-left h1 {{ font-size: 1.5rem; color: #60a5fa; margin-bottom: 4px; }}
-        .code-badge {{
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            font-family: 'SF Mono', Monaco, monospace;
-            background: rgba(96, 165, 250, 0.15);
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 1.1rem;
-            color: #60a5fa;
-            font-weight: 600;
-        }}
-        .expiration-banner {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            padding: 10px 16px;
-            background: rgba(255,255,255,0.05);
-            border-radius: 8px;
-            font-size: 0.85rem;
-            color: #a1a1aa;
-            margin-bottom: 16px;
-        }}
-        .expiration-banner.warning {{
-            background: rgba(245, 158, 11, 0.15);
-            color: #fbbf24;
-            border: 1px solid rgba(245, 158, 11, 0.3);
-        }}
-        .expiration-banner.premium {{
-            background: rgba(168, 85, 247, 0.15);
-            color: #c084fc;
-            border: 1px solid rgba(168, 85, 247, 0.3);
-        }}
-        .expiration-icon {{ font-size: 1rem; }}
-        .status {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 0.85rem;
-            color: #71717a;
-            margin-bottom: 20px;
-        }}
-        .status .dot {{
-            width: 8px;
-            height: 8px;
-            background: #22c55e;
-            border-radius: 50%;
-            animation: pulse 2s infinite;
-        }}
-        @keyframes pulse {{ 0%, 100% {{ opacity: 1; }} 50% {{ opacity: 0.5; }} }}
-        .stats {{ text-align: right; }}
-        .stats .count {{ font-size: 1.5rem; font-weight: 700; color: #ffffff; }}
-        .stats .label {{ font-size: 0.8rem; color: #71717a; }}
-        .entries {{ display: flex; flex-direction: column; gap: 12px; }}
-        .entry {{
-            background: rgba(255,255,255,0.05);
-            border-radius: 12px;
-            padding: 16px;
-            border-left: 3px solid #60a5fa;
-        }}
-        .entry-header {{ display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px; }}
-        .timestamp {{ font-size: 0.75rem; color: #71717a; font-family: monospace; }}
-        .copy-btn {{
-            background: rgba(96, 165, 250, 0.2);
-            border: none;
-            color: #60a5fa;
-            padding: 4px 12px;
-            border-radius: 6px;
-            font-size: 0.75rem;
-            cursor: pointer;
-        }}
-        .copy-btn:hover {{ background: rgba(96, 165, 250, 0.3); }}
-        .copy-btn.copied {{ background: #22c55e; color: white; }}
-        .text {{ font-size: 1rem; line-height: 1.6; word-break: break-word; white-space: pre-wrap; color: #f4f4f5; }}
-        .empty {{ text-align: center; padding: 80px 20px; color: #71717a; }}
-        .empty-icon {{ font-size: 4rem; margin-bottom: 16px; opacity: 0.5; }}
-        .empty p {{ font-size: 1.2rem; margin-bottom: 8px; }}
-        .back-link {{ display: inline-block; margin-top: 24px; color: #60a5fa; text-decoration: none; font-size: 0.9rem; }}
-        .back-link:hover {{ text-decoration: underline; }}
-        .summarize-section {{ margin: 20px 0; }}
-        .summarize-btn {{
-            background: linear-gradient(135deg, #8b5cf6, #6366f1);
-            border: none; color: white; padding: 10px 20px; border-radius: 10px;
-            font-size: 0.9rem; font-weight: 600; cursor: pointer; display: inline-flex;
-            align-items: center; gap: 8px; transition: opacity 0.2s;
-        }}
-        .summarize-btn:hover {{ opacity: 0.85; }}
-        .summarize-btn:disabled {{ opacity: 0.5; cursor: not-allowed; }}
-        .summary-box {{
-            background: rgba(139,92,246,0.1); border: 1px solid rgba(139,92,246,0.25);
-            border-radius: 12px; padding: 20px; margin-top: 12px; display: none;
-            line-height: 1.6; color: #d4d4d8; font-size: 0.95rem; white-space: pre-wrap;
-        }}
-        .summary-box.show {{ display: block; }}
-        .export-btns {{ display: flex; gap: 8px; margin: 16px 0; flex-wrap: wrap; }}
-        .export-btn {{
-            background: rgba(255,255,255,0.08); border: 1px solid rgba(255,255,255,0.15);
-            color: #a1a1aa; padding: 6px 14px; border-radius: 8px; font-size: 0.8rem;
-            cursor: pointer; text-decoration: none; transition: all 0.2s;
-        }}
-        .export-btn:hover {{ background: rgba(255,255,255,0.15); color: #e4e4e7; }}
-    </style>
+    <title>PasteBridge - {{ code }}</title>
+    <link rel="stylesheet" href="/api/static/{{ css }}">
 </head>
 <body>
     <div class="container">
         <div class="header">
             <div class="header-left">
                 <h1>PasteBridge</h1>
-                <div class="code-badge">🔗 {notepad_code}</div>
+                <div class="code-badge">🔗 {{ code }}</div>
             </div>
             <div class="stats">
-                <div class="count" id="entryCount">{entry_count}</div>
+                <div class="count" id="entryCount">{{ entry_count }}</div>
                 <div class="label">entries</div>
             </div>
         </div>
-        {expiration_banner}
+        {{ expiration_banner }}
         <div class="export-btns">
-            <a href="/api/notepad/{notepad_code}/export?format=txt" class="export-btn" download>Export TXT</a>
-            <a href="/api/notepad/{notepad_code}/export?format=md" class="export-btn" download>Export MD</a>
-            <a href="/api/notepad/{notepad_code}/export?format=json" class="export-btn" download>Export JSON</a>
+            <a href="/api/notepad/{{ code }}/export?format=txt" class="export-btn" download>Export TXT</a>
+            <a href="/api/notepad/{{ code }}/export?format=md" class="export-btn" download>Export MD</a>
+            <a href="/api/notepad/{{ code }}/export?format=json" class="export-btn" download>Export JSON</a>
         </div>
         <div class="summarize-section">
             <button class="summarize-btn" id="summarizeBtn" onclick="summarizeNotepad()">AI Summarize</button>
@@ -2289,117 +3065,96 @@ async def view_notepad(code: str):
             <span class="dot"></span>
             <span id="statusText">Live updating</span>
         </div>
-        <div class="entries" id="entriesContainer">
-            {entries_html}
-        </div>
+        <div class="entries" id="entriesContainer"></div>
+        <template id="entryTpl"><div class="entry"><div class="entry-header"><span class="timestamp"></span><button class="copy-btn">Copy</button></div><div class="text"></div></div></template>
         <a href="/api/" class="back-link">← Enter different code</a>
     </div>
-    <script>
-        var CODE = '{notepad_code}';
-        var lastCount = {entry_count};
-        
-        function copyFromData(btn) {{
-            var text = btn.getAttribute('data-text');
-            navigator.clipboard.writeText(text).then(function() {{
-                btn.textContent = 'Copied!';
-                btn.classList.add('copied');
-                setTimeout(function() {{
-                    btn.textContent = 'Copy';
-                    btn.classList.remove('copied');
-                }}, 2000);
-            }});
-        }}
-        
-        function escapeHtml(str) {{
-            var div = document.createElement('div');
-            div.textContent = str;
-            return div.innerHTML;
-        }}
-        
-        function escapeAttr(str) {{
-            return str.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;').replace(/'/g, '&#39;');
-        }}
-        
-        function formatTime(ts) {{
-            var d = new Date(ts);
-            return d.toLocaleTimeString('en-US', {{ hour12: false }});
-        }}
-        
-        function renderEntries(entries) {{
-            var container = document.getElementById('entriesContainer');
-            var countEl = document.getElementById('entryCount');
-            countEl.textContent = entries.length;
-            
-            if (entries.length === 0) {{
-                container.innerHTML = '<div class="empty"><div class="empty-icon">📋</div><p>No entries yet</p><p style="font-size:0.9rem;color:#52525b;">Copy text on your phone and tap the capture button</p></div>';
-                return;
-            }}
-            
-            if (entries.length !== lastCount) {{
-                var html = '';
-                for (var i = entries.length - 1; i >= 0; i--) {{
-                    var entry = entries[i];
-                    var textDisplay = escapeHtml(entry.text).replace(/\\n/g, '<br>');
-                    var textData = escapeAttr(entry.text);
-                    html += '<div class="entry"><div class="entry-header"><span class="timestamp">' + formatTime(entry.timestamp) + '</span><button class="copy-btn" data-text="' + textData + '" onclick="copyFromData(this)">Copy</button></div><div class="text">' + textDisplay + '</div></div>';
-                }}
-                container.innerHTML = html;
-                lastCount = entries.length;
-            }}
-        }}
-        
-        function poll() {{
-            fetch('/api/notepad/' + CODE)
-                .then(function(r) {{ 
-                    if (r.status === 410) {{
-                        document.getElementById('statusText').textContent = 'Notepad expired';
-                        return null;
-                    }}
-                    return r.json(); 
-                }})
-                .then(function(data) {{
-                    if (data) {{
-                        renderEntries(data.entries);
-                        document.getElementById('statusText').textContent = 'Live updating';
-                    }}
-                }})
-                .catch(function() {{
-                    document.getElementById('statusText').textContent = 'Reconnecting...';
-                }});
-        }}
-        
-        setInterval(poll, 3000);
-        
-        async function summarizeNotepad() {{
-            var btn = document.getElementById('summarizeBtn');
-            var box = document.getElementById('summaryBox');
-            btn.disabled = true;
-            btn.textContent = 'Summarizing...';
-            box.className = 'summary-box show';
-            box.textContent = 'Analyzing content with AI...';
-            try {{
-                var r = await fetch('/api/notepad/' + CODE + '/summarize', {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{max_length: 500}})
-                }});
-                var d = await r.json();
-                if (r.ok) {{
-                    box.textContent = d.summary;
-                }} else {{
-                    box.textContent = d.detail || 'Summarization failed';
-                }}
-            }} catch(e) {{
-                box.textContent = 'Error connecting to AI service';
-            }}
-            btn.disabled = false;
-            btn.textContent = 'AI Summarize';
-        }}
-    </script>
+    <script id="initialData" type="application/json">{{ initial_data }}</script>
+    <script src="/api/static/{{ js }}"></script>
 </body>
-</html>'''
+</html>''')
+
+
+VIEW_PUSH_INTERVAL_SECONDS = 30
+recent_view_pushes = ExpiringCache(maxsize=10_000)
+
+
+@api_router.get("/notepad/{code}/view", response_class=HTMLResponse)
+async def view_notepad(request: Request, code: CodeStr, limit: int = RECENT_ENTRIES_LIMIT):
+    """Web view of notepad, rendering at most `limit` of the most recent entries"""
+    limit = min(max(limit, 1), RECENT_ENTRIES_LIMIT)
+    notepad = await notepad_cache.get(code, _fetch_notepad)
+    if not notepad:
+        return HTMLResponse(content=VIEW_NOT_FOUND_HTML, status_code=404)
+
+    expires_at = notepad.get("expires_at")
+    if expires_at and is_expired(expires_at):
+        return HTMLResponse(content=VIEW_EXPIRED_HTML, status_code=410)
+
+    # A refresh of an unchanged notepad gets a 304 before any owner lookup, push or rendering
+    expires_at, days_remaining, is_expiring_soon = resolve_expiration(notepad)
+    version = f"{VIEW_PAGE.version}:{VIEW_JS.version}:{VIEW_CSS.version}:{notepad.get('updated_at')}:{notepad['entry_count']}:{days_remaining}:{limit}"
+    etag = f'"{hashlib.md5(version.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    # Send push notification to notepad owner, at most once per interval per notepad
+    owner_id = notepad.get("user_id")
+    if owner_id and recent_view_pushes.get(code) is None:
+        recent_view_pushes.set(code, True, VIEW_PUSH_INTERVAL_SECONDS)
+        owner = await find_user(owner_id)
+        push_tokens = owner.get("push_tokens") if owner else None
+        if push_tokens:
+            run_in_background(send_push_notification(
+                push_tokens,
+                "Notepad Viewed",
+                f"Someone is viewing your notepad '{code}'",
+                {"code": code, "event": "view"}
+            ))
+    
+    notepad_code = notepad.get("code")
+    
+    if expires_at:
+        expiration_date_str = expires_at.strftime("%B %d, %Y")
+        if is_expiring_soon:
+            expiration_banner = f'''<div class="expiration-banner warning">
+                <span class="expiration-icon">⚠️</span>
+                <span>Expires in {days_remaining} day{"s" if days_remaining != 1 else ""} ({expiration_date_str})</span>
+            </div>'''
+        else:
+            expiration_banner = f'''<div class="expiration-banner">
+                <span class="expiration-icon">📅</span>
+                <span>Expires {expiration_date_str} ({days_remaining} days)</span>
+            </div>'''
+    else:
+        expiration_banner = '''<div class="expiration-banner premium">
+            <span class="expiration-icon">⭐</span>
+            <span>Premium notepad - Never expires</span>
+        </div>'''
+    
+    entry_count = notepad["entry_count"]
+    # Entries are rendered client-side by the same code the live updates use; "<" is
+    # escaped so entry text can't close the script element
+    initial_data = orjson.dumps(
+        {
+            "code": notepad_code,
+            "entries": notepad.get("entries", [])[-limit:],
+            "entry_count": entry_count,
+            "updated_at": notepad.get("updated_at"),
+            "limit": limit,
+        },
+        option=orjson.OPT_NAIVE_UTC
+    )
     
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=VIEW_PAGE.render(
+        code=notepad_code,
+        entry_count=str(entry_count),
+        expiration_banner=expiration_banner,
+        initial_data=initial_data.replace(b"<", b"\\u003c"),
+        css=VIEW_CSS_NAME,
+        js=VIEW_JS_NAME
+    ), headers=headers)
 
 
 @api_router.get("/health")
@@ -2407,43 +3162,128 @@ async def health():
     return {"status": "healthy", "service": "PasteBridge API"}
 
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database indexes and run the background cleanup cron for the app's lifetime"""
+    # Fail fast on a bad MONGO_URL and open the pool before the first request arrives
+    await client.admin.command("ping")
+    # One cheap hash so the first login doesn't pay bcrypt's one-time setup
+    await run_in_threadpool(bcrypt.hashpw, b"warmup", bcrypt.gensalt(4))
+    # Create indexes (sparse=True for unique to allow nulls), one createIndexes command per collection
+    await asyncio.gather(
+        db.notepads.create_indexes([
+            IndexModel("code", unique=True, sparse=True),
+            IndexModel([("user_id", 1), ("updated_at", -1)]),  # Owner lookups and the sorted listing
+            IndexModel("account_type"),
+            IndexModel("collaborators"),  # Shared-notepad listing and search
+            IndexModel([("expires_at", 1), ("account_type", 1)]),  # Expiry cleanup and stats counts
+        ]),
+        db.users.create_indexes([
+            IndexModel("email", unique=True, sparse=True),
+            IndexModel("id", unique=True, sparse=True),
+        ]),
+        db.feedback.create_indexes([
+            # list_feedback filters on status and/or category and sorts newest first
+            IndexModel([("status", 1), ("category", 1), ("created_at", -1)]),
+            IndexModel([("category", 1), ("created_at", -1)]),
+            IndexModel([("created_at", -1)]),
+        ]),
+        db.webhooks.create_indexes([IndexModel("user_id")]),
+        db.password_resets.create_indexes([IndexModel("token"), IndexModel("expires_at")]),
+        db.payment_transactions.create_indexes([IndexModel("session_id", unique=True)]),
+        db.stripe_events.create_indexes([IndexModel("created_at", expireAfterSeconds=STRIPE_EVENT_RETENTION_SECONDS)]),
+        db.feedback_summaries.create_indexes([
+            IndexModel("created_at", expireAfterSeconds=int(FEEDBACK_SUMMARY_TTL.total_seconds()))
+        ]),
+    )
+    # TTL index so Mongo itself removes expired guest/user notepads between cron runs
+    ttl_options = {"expireAfterSeconds": 0, "partialFilterExpression": {"account_type": {"$in": ["guest", "user"]}}}
+    # With the TTL monitor doing the work, the cron is only a daily backstop
+    cron_interval_hours = 24
+    try:
+        try:
+            await db.notepads.create_index("expires_at", **ttl_options)
+        except OperationFailure as e:
+            # IndexOptionsConflict / IndexKeySpecsConflict: the plain expires_at index created by
+            # earlier deployments holds the name, so replace it. Servers that reject the TTL spec
+            # itself fail with another code and keep their plain index untouched.
+            if e.code not in (85, 86):
+                raise
+            try:
+                await db.notepads.drop_index("expires_at_1")
+            except OperationFailure:
+                pass  # Another worker already dropped it
+            await db.notepads.create_index("expires_at", **ttl_options)
+    except OperationFailure as e:
+        logger.warning(f"TTL index on notepads.expires_at unavailable, relying on cron cleanup: {e}")
+        await db.notepads.create_index("expires_at")
+        cron_interval_hours = 6
+    logger.info("Database indexes created")
+    cron_task = asyncio.create_task(cleanup_cron(cron_interval_hours))
+    logging.getLogger("cron").info(f"Cleanup cron job started (every {cron_interval_hours} hours)")
+
+    yield
+
+    cron_task.cancel()
+    notepad_updates.close()
+    append_batcher.close()
+    await rate_limiter.close()
+    await http_client.aclose()
+    await client.close()
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses except Server-Sent Events, which the compressor would buffer"""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Create the main app without a prefix
+app = FastAPI(lifespan=lifespan, default_response_class=UTCJSONResponse)
+
 app.include_router(api_router)
 
+# Level 5 keeps most of the size win at a fraction of level 9's CPU per response
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=512, compresslevel=5)
+
+# Credentials are only allowed with an explicit origin list; "*" plus credentials is invalid CORS
+cors_origins = [o.strip() for o in os.environ.get("CORS_ORIGINS", "*").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_credentials=cors_origins != ["*"],
+    allow_origins=cors_origins,
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
-async def start_cron():
-    """Start background cleanup cron job and create database indexes"""
-    # Create indexes (sparse=True for unique to allow nulls)
-    await db.notepads.create_index("code", unique=True, sparse=True)
-    await db.notepads.create_index("user_id")
-    await db.notepads.create_index("expires_at")
-    await db.notepads.create_index("account_type")
-    await db.users.create_index("email", unique=True, sparse=True)
-    await db.users.create_index("id", unique=True, sparse=True)
-    await db.feedback.create_index("status")
-    await db.feedback.create_index("category")
-    await db.feedback.create_index([("created_at", -1)])
-    await db.webhooks.create_index("user_id")
-    await db.password_resets.create_index("token")
-    await db.password_resets.create_index("expires_at")
-    logging.getLogger(__name__).info("Database indexes created")
-    asyncio.create_task(cleanup_cron())
-    logging.getLogger("cron").info("Cleanup cron job started (every 6 hours)")
-
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+if __name__ == "__main__":
+    import uvicorn
+
+    # One worker per core by default. Workers are fresh processes that import this module
+    # (so each opens its own Mongo client and caches) and inherit the environment, so
+    # each one sizes its pool to its share of MONGO_MAX_CONNECTIONS.
+    workers = int(os.environ.setdefault("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", "8001")),
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        proxy_headers=True,
+        # Longer than the page's poll interval, so polling tabs reuse their connection
+        timeout_keep_alive=75,
+    )
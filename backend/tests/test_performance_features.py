@@ -0,0 +1,250 @@
+"""
+PasteBridge Performance Iteration Tests
+
+Tests for caching and round-trip reductions:
+- GET /api/, /api/subscription/plans-page - static pages served from pre-encoded bytes with ETag / 304 support
+- GET /api/notepad/{code} - short-lived read cache (stale for at most its TTL across workers), ETag / 304 for unchanged polls
+- GET /api/notepad/{code}/view - entries embedded as a JSON bootstrap, ETag / 304 on unchanged notepads,
+  CSS/JS served from content-hashed /api/static URLs
+- POST /api/notepad/{code}/append - concurrent appends group-committed per notepad, failures isolated per notepad
+- GET /api/auth/notepads - skip/limit pagination sorted by updated_at
+"""
+
+import pytest
+import requests
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Generate unique test run identifier
+TEST_RUN_ID = str(uuid.uuid4())[:8]
+
+# Notepad reads are cached per worker, so another worker may serve a stale read for this long
+NOTEPAD_CACHE_TTL = float(os.environ.get('NOTEPAD_CACHE_TTL', '1.0'))
+
+
+def wait_for(fetch, check, timeout=NOTEPAD_CACHE_TTL + 1.0):
+    """Call fetch until check passes on its result or timeout elapses; returns the last result"""
+    deadline = time.monotonic() + timeout
+    result = fetch()
+    while not check(result) and time.monotonic() < deadline:
+        time.sleep(0.1)
+        result = fetch()
+    return result
+
+
+@pytest.fixture(scope="module")
+def api_client():
+    """Shared requests session"""
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+class TestStaticPages:
+    """Pre-rendered HTML pages"""
+
+    def test_landing_page_has_etag_and_cache_control(self, api_client):
+        """Test GET /api/ returns an ETag and a public Cache-Control header"""
+        response = api_client.get(f"{BASE_URL}/api/")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert "text/html" in response.headers.get("content-type", "")
+        assert response.headers.get("etag"), "Missing ETag header"
+        assert "public" in response.headers.get("cache-control", "")
+        assert "PasteBridge" in response.text
+        print(f"✓ Landing page ETag: {response.headers['etag']}")
+
+    def test_landing_page_returns_304_for_matching_etag(self, api_client):
+        """Test GET /api/ with If-None-Match returns 304 Not Modified"""
+        etag = api_client.get(f"{BASE_URL}/api/").headers.get("etag")
+        response = api_client.get(f"{BASE_URL}/api/", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+        assert response.content == b""
+        print("✓ Landing page returns 304 for a matching ETag")
+
+    def test_landing_page_ignores_stale_etag(self, api_client):
+        """Test GET /api/ with a stale If-None-Match returns the full page"""
+        response = api_client.get(f"{BASE_URL}/api/", headers={"If-None-Match": f'"stale-{TEST_RUN_ID}"'})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert "PasteBridge" in response.text
+        print("✓ Landing page ignores a stale ETag")
+
+    def test_plans_page_returns_304_for_matching_etag(self, api_client):
+        """Test GET /api/subscription/plans-page is served with an ETag and honours If-None-Match"""
+        response = api_client.get(f"{BASE_URL}/api/subscription/plans-page")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert "PasteBridge Plans" in response.text
+        etag = response.headers.get("etag")
+        assert etag, "Missing ETag header"
+        response = api_client.get(f"{BASE_URL}/api/subscription/plans-page", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+        print(f"✓ Plans page ETag: {etag}")
+
+
+class TestNotepadReadCache:
+    """Cached notepad reads catch up with writes within the cache TTL"""
+
+    def test_get_reflects_append(self, api_client):
+        """Test GET /api/notepad/{code} sees an append made right after a cached read"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        assert api_client.get(f"{BASE_URL}/api/notepad/{code}").json()["entries"] == []
+
+        text = f"cache-{TEST_RUN_ID}"
+        api_client.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": text})
+        data = wait_for(lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}").json(), lambda d: d["entries"])
+        assert [e["text"] for e in data["entries"]] == [text]
+        assert data["entry_count"] == 1
+        print(f"✓ Cached read invalidated by append on {code}")
+
+    def test_get_reflects_clear(self, api_client):
+        """Test GET /api/notepad/{code} sees a clear made right after a cached read"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        api_client.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": f"clear-{TEST_RUN_ID}"})
+        data = wait_for(lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}").json(), lambda d: d["entries"])
+        assert data["entry_count"] == 1
+
+        api_client.delete(f"{BASE_URL}/api/notepad/{code}")
+        data = wait_for(lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}").json(), lambda d: not d["entries"])
+        assert data["entries"] == []
+        assert data["entry_count"] == 0
+        print(f"✓ Cached read invalidated by clear on {code}")
+
+    def test_get_revalidates_with_etag(self, api_client):
+        """Test GET /api/notepad/{code} returns 304 for a matching If-None-Match until the notepad changes"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        etag = api_client.get(f"{BASE_URL}/api/notepad/{code}").headers.get("etag")
+        assert etag, "Missing ETag header"
+
+        response = api_client.get(f"{BASE_URL}/api/notepad/{code}", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+        assert response.content == b""
+
+        api_client.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": f"poll-{TEST_RUN_ID}"})
+        response = wait_for(
+            lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}", headers={"If-None-Match": etag}),
+            lambda r: r.status_code != 304,
+        )
+        assert response.status_code == 200, f"Expected 200 after append, got {response.status_code}"
+        assert response.json()["entry_count"] == 1
+        print(f"✓ Poll of {code} revalidates with its ETag")
+
+
+class TestViewPageBootstrap:
+    """View page embeds its entries as JSON instead of server-rendered HTML"""
+
+    def test_view_embeds_entries_as_escaped_json(self, api_client):
+        """Test GET /api/notepad/{code}/view embeds entry text with '<' escaped"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        text = f"</script><b>{TEST_RUN_ID}</b>"
+        api_client.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": text})
+
+        response = api_client.get(f"{BASE_URL}/api/notepad/{code}/view")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert 'id="initialData"' in response.text
+        assert f"\\u003c/script>\\u003cb>{TEST_RUN_ID}" in response.text
+        assert text not in response.text
+        print(f"✓ View page for {code} embeds escaped JSON entries")
+
+    def test_view_revalidates_with_etag(self, api_client):
+        """Test GET /api/notepad/{code}/view returns 304 until the notepad changes"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        etag = api_client.get(f"{BASE_URL}/api/notepad/{code}/view").headers.get("etag")
+        assert etag, "Missing ETag header"
+
+        response = api_client.get(f"{BASE_URL}/api/notepad/{code}/view", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+
+        api_client.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": f"etag-{TEST_RUN_ID}"})
+        response = wait_for(
+            lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}/view", headers={"If-None-Match": etag}),
+            lambda r: r.status_code != 304,
+        )
+        assert response.status_code == 200, f"Expected 200 after append, got {response.status_code}"
+        assert response.headers.get("etag") != etag
+        print(f"✓ View page for {code} revalidates with its ETag")
+
+    def test_view_assets_are_long_cached(self, api_client):
+        """Test the view page's CSS/JS are served from content-hashed /api/static URLs"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        html = api_client.get(f"{BASE_URL}/api/notepad/{code}/view").text
+        assets = re.findall(r'/api/static/view\.\w+\.(?:css|js)', html)
+        assert len(assets) == 2, f"Expected a stylesheet and a script, got {assets}"
+        for path in assets:
+            response = api_client.get(f"{BASE_URL}{path}")
+            assert response.status_code == 200, f"Expected 200 for {path}, got {response.status_code}"
+            assert "max-age=31536000" in response.headers.get("cache-control", "")
+        assert api_client.get(f"{BASE_URL}/api/static/view.missing.js").status_code == 404
+        print(f"✓ View assets long-cached: {assets}")
+
+
+class TestBatchedAppends:
+    """Concurrent appends are written together without losing entries"""
+
+    def test_concurrent_appends_all_land(self, api_client):
+        """Test concurrent POST /api/notepad/{code}/append calls all succeed and are all stored"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        texts = [f"batch-{TEST_RUN_ID}-{i}" for i in range(10)]
+
+        def append(text):
+            return requests.post(f"{BASE_URL}/api/notepad/{code}/append", json={"text": text})
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            responses = list(pool.map(append, texts))
+        assert all(r.status_code == 200 for r in responses), [r.status_code for r in responses]
+
+        data = api_client.get(f"{BASE_URL}/api/notepad/{code}").json()
+        assert data["entry_count"] == len(texts)
+        assert sorted(e["text"] for e in data["entries"]) == sorted(texts)
+        print(f"✓ {len(texts)} concurrent appends stored on {code}")
+
+    def test_failed_append_does_not_fail_other_notepads(self, api_client):
+        """Test appends racing a failing append to another code still succeed and are stored once"""
+        code = api_client.post(f"{BASE_URL}/api/notepad").json()["code"]
+        missing = f"missing-{TEST_RUN_ID}"
+        jobs = [(code, f"mixed-{TEST_RUN_ID}-{i}") for i in range(8)] + [(missing, "x")] * 4
+
+        def append(job):
+            return requests.post(f"{BASE_URL}/api/notepad/{job[0]}/append", json={"text": job[1]})
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            responses = list(pool.map(append, jobs))
+        statuses = [r.status_code for r in responses]
+        assert statuses == [200] * 8 + [404] * 4, statuses
+
+        data = wait_for(lambda: api_client.get(f"{BASE_URL}/api/notepad/{code}").json(), lambda d: d["entry_count"] == 8)
+        assert sorted(e["text"] for e in data["entries"]) == sorted(text for _, text in jobs[:8])
+        print(f"✓ Appends to {code} unaffected by concurrent failures on {missing}")
+
+    def test_append_to_missing_notepad_returns_404(self, api_client):
+        """Test POST /api/notepad/{code}/append on an unknown code returns 404"""
+        response = api_client.post(f"{BASE_URL}/api/notepad/missing-{TEST_RUN_ID}/append", json={"text": "x"})
+        assert response.status_code == 404, f"Expected 404, got {response.status_code}"
+        print("✓ Append to a missing notepad returns 404")
+
+
+class TestUserNotepadsPagination:
+    """GET /api/auth/notepads pages through notepads newest-updated first"""
+
+    @pytest.fixture(scope="class")
+    def auth_headers(self, api_client):
+        email = f"TEST_paging_{TEST_RUN_ID}@example.com"
+        response = api_client.post(f"{BASE_URL}/api/auth/register", json={"email": email, "password": "testpass123"})
+        assert response.status_code == 200, f"Registration failed: {response.text}"
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        for _ in range(3):
+            api_client.post(f"{BASE_URL}/api/notepad", headers=headers)
+        return headers
+
+    def test_limit_and_skip(self, api_client, auth_headers):
+        """Test limit/skip split the listing without overlap"""
+        first = api_client.get(f"{BASE_URL}/api/auth/notepads?limit=2", headers=auth_headers).json()
+        rest = api_client.get(f"{BASE_URL}/api/auth/notepads?skip=2&limit=2", headers=auth_headers).json()
+        assert len(first) == 2
+        assert len(rest) == 1
+        assert not {n["code"] for n in first} & {n["code"] for n in rest}
+        assert first[0]["updated_at"] >= first[1]["updated_at"] >= rest[0]["updated_at"]
+        print("✓ User notepads paginate newest first")